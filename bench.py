@@ -0,0 +1,893 @@
+import argparse
+import os
+import time
+import timeit
+import numpy
+
+from components import bezier
+from components.pathdata import PathData
+
+
+# benchmarks for the path maths/buffers (run: python bench.py <name>)
+
+
+# time a function, best of a few repeats (seconds per call)
+def best(fn, number=1, repeat=5):
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+
+
+# headless gl context for the benchmarks that use buffers, no window or display needed
+# (gl only imported by these, the maths benchmarks run without it)
+def glContext():
+    from components.offscreen import OffscreenContext
+    return OffscreenContext(64, 64)
+
+
+# Path class settings the benchmarks change (sizes, seed, modes)
+SETTINGS = ("arcs", "arcsegments", "degree", "nextSeed", "gpuCurve", "adaptive", "tolerance",
+            "nearestPiece", "pickLeaf", "keepCpu", "compact")
+
+# for the gl benchmarks that change the Path settings, puts them back after (try/finally), so a benchmark
+# runs under the same settings in a full run as when it's run on its own
+def restoresSettings(bench):
+    def run(args):
+        import components.offscreen
+        from components.path import Path
+        saved = {name: getattr(Path, name) for name in SETTINGS}
+        try:
+            bench(args)
+        finally:
+            for name, value in saved.items():
+                setattr(Path, name, value)
+    return run
+
+
+# number of live buffer, vertex array and texture names (checks names below upto)
+def liveNames(upto=4096):
+    from OpenGL.GL import glIsBuffer, glIsVertexArray, glIsTexture
+    return sum(bool(glIsBuffer(i)) + bool(glIsVertexArray(i)) + bool(glIsTexture(i)) for i in range(1, upto))
+
+
+# random (arcs, 3, 3) start/control/end array like a generated path
+def randomArcs(arcs):
+    points = numpy.random.uniform(low=-5, high=5, size=(arcs + 1, 3))
+    controls = numpy.random.uniform(low=-4, high=4, size=(arcs, 3))
+    return bezier.arcsFrom(points, controls)
+
+
+# old per vertex python loop vs batched numpy evaluation of a whole path
+def benchEvaluate(args):
+    for arcs, segments in ((8, 80), (100, 100), (300, 300)):
+        arcarray = randomArcs(arcs)
+
+        def loop():
+            curve = []
+            for p0, p1, p2 in arcarray:
+                curve.extend(PathData.calcNew(p0, p1, p2, segments))
+            return numpy.array(curve, dtype=numpy.float32)
+
+        def batched():
+            return bezier.evaluate(arcarray, segments)
+
+        # both must give the same vertex buffer
+        assert numpy.array_equal(loop().reshape(-1, 3), batched())
+
+        tloop = best(loop, repeat=3)
+        tbatch = best(batched, number=10)
+        print(f"{arcs:4d} arcs x {segments:4d} segments   loop {tloop * 1000:9.2f} ms   "
+              f"numpy {tbatch * 1000:7.2f} ms   x{tloop / tbatch:.0f}")
+
+
+# gpu curves (Path.gpuCurve, evaluated in the path shader) against the numpy curve, the shaders positions
+# (view/proj identity) read back through transform feedback have to match within float32 rounding, and a
+# gpu path traced to its end after the segments change ends on its last vertex, with the time to evaluate
+@restoresSettings
+def benchGpuCurve(args):
+    context = glContext()
+    from OpenGL.GL import (GL_VERTEX_SHADER, GL_FALSE, GL_TRANSFORM_FEEDBACK_BUFFER, GL_STREAM_READ, GL_POINTS,
+                           GL_RASTERIZER_DISCARD, GL_TEXTURE0, GL_TEXTURE1, GL_TEXTURE_BUFFER, glUseProgram,
+                           glGetUniformLocation, glUniform1i, glUniform3f, glUniformMatrix4fv, glGenBuffers,
+                           glDeleteBuffers, glGenVertexArrays, glDeleteVertexArrays, glBindVertexArray, glBindBuffer,
+                           glBufferData, glBindBufferBase, glGetBufferSubData, glActiveTexture, glBindTexture,
+                           glEnable, glDisable, glBeginTransformFeedback, glEndTransformFeedback, glDrawArrays,
+                           glFinish, glDeleteProgram)
+    from OpenGL.GL.shaders import compileShader
+    from components.shader import Shader
+    from components.scene import PATH_VERTEX
+    from components.path import Path
+
+    # the path vertex shader alone, capturing its positions (nothing rasterized)
+    with open(PATH_VERTEX) as fle:
+        program = Shader.link(compileShader(fle.read(), GL_VERTEX_SHADER), varyings=["gl_Position"])
+    glUseProgram(program)
+    identity = numpy.identity(4, dtype=numpy.float32)
+    glUniformMatrix4fv(glGetUniformLocation(program, "view"), 1, GL_FALSE, identity)
+    glUniformMatrix4fv(glGetUniformLocation(program, "proj"), 1, GL_FALSE, identity)
+    glUniform3f(glGetUniformLocation(program, "quantscale"), 1, 1, 1)
+    glUniform1i(glGetUniformLocation(program, "gpucurve"), 1)
+    glUniform1i(glGetUniformLocation(program, "points"), 0)
+    glUniform1i(glGetUniformLocation(program, "controls"), 1)
+    vao = glGenVertexArrays(1)  # no attributes, the gpu curve only reads the texture buffers
+    feedback = glGenBuffers(1)
+
+    # positions of the gpu curve as the shader evaluates them
+    def evaluate(path):
+        n = path.curveVertices()
+        glBindBuffer(GL_TRANSFORM_FEEDBACK_BUFFER, feedback)
+        glBufferData(GL_TRANSFORM_FEEDBACK_BUFFER, n * 16, None, GL_STREAM_READ)
+        glBindBufferBase(GL_TRANSFORM_FEEDBACK_BUFFER, 0, feedback)
+        glUniform1i(glGetUniformLocation(program, "arcsegments"), Path.arcsegments)
+        glUniform1i(glGetUniformLocation(program, "degree"), path.deg)
+        glActiveTexture(GL_TEXTURE0)
+        glBindTexture(GL_TEXTURE_BUFFER, path.pointstex)
+        glActiveTexture(GL_TEXTURE1)
+        glBindTexture(GL_TEXTURE_BUFFER, path.controlstex)
+
+        glBindVertexArray(vao)
+        glEnable(GL_RASTERIZER_DISCARD)
+        glBeginTransformFeedback(GL_POINTS)
+        glDrawArrays(GL_POINTS, 0, n)
+        glEndTransformFeedback()
+        glDisable(GL_RASTERIZER_DISCARD)
+        glBindVertexArray(0)
+        glFinish()
+        return numpy.frombuffer(glGetBufferSubData(GL_TRANSFORM_FEEDBACK_BUFFER, 0, n * 16), dtype=numpy.float32).reshape(-1, 4)
+
+    Path.gpuCurve = True
+    for degree in (2, 3, 5, 8):
+        Path.arcs, Path.arcsegments, Path.degree = 300, 100, degree
+        path = Path()
+
+        # the segments slider moves, the gpu curve follows it without a new path
+        for segments in (100, 37):
+            Path.arcsegments = segments
+            gpu = evaluate(path)
+            cpu = bezier.evaluate(path.arcdata, segments)
+            error = numpy.abs(gpu[:, :3] - cpu).max()
+            assert error < 1e-4, "gpu curve disagrees with the numpy curve"
+
+            end, tip = path.trace(path.length())
+            assert end == path.curveVertices() - 1 and tip is None, "gpu curve traced past the vertices it draws"
+
+            tgpu = best(lambda: evaluate(path), repeat=5)
+            tcpu = best(lambda: bezier.evaluate(path.arcdata, segments), repeat=5)
+            print(f"degree {degree}   {Path.arcs} arcs x {segments:3d} segments   shader (read back) {tgpu * 1000:6.2f} ms   "
+                  f"numpy {tcpu * 1000:6.2f} ms   largest difference {error:.1e}")
+        path.release()
+
+    glDeleteBuffers(1, [feedback])
+    glDeleteVertexArrays(1, [vao])
+    glDeleteProgram(program)
+    context.release()
+
+
+# evaluating paths of each degree, with the bernstein basis cached (regenerating at the same settings)
+# and computed every time, and generating whole paths (random arcs and curve), in vertices per second
+def benchDegree(args):
+    arcs, segments = 300, 300
+    for degree in (2, 3, 4, 6, 8):
+        points, controls = PathData.randomArcs(1, arcs, degree=degree)
+        arcarray = bezier.arcsFrom(points[0], controls[0], degree)
+        vertices = arcs * segments
+
+        def uncached():
+            bezier.basis.cache_clear()
+            return bezier.evaluate(arcarray, segments)
+
+        tcached = best(lambda: bezier.evaluate(arcarray, segments), number=10)
+        tuncached = best(uncached, number=10)
+        tgenerate = best(lambda: PathData.generate(arcs, segments, degree=degree), number=10)
+        print(f"degree {degree}   {arcs} arcs x {segments} segments   evaluate {vertices / tcached / 1e6:7.1f} M vertices/s "
+              f"(basis computed each time {vertices / tuncached / 1e6:7.1f})   generate {vertices / tgenerate / 1e6:6.1f} M vertices/s")
+
+
+# regenerating a path many times must reuse its gl objects (live names stay flat)
+def benchRegenerate(args):
+    context = glContext()
+    from OpenGL.GL import glFinish
+    from components.path import Path
+
+    path = Path()
+    before = liveNames()
+
+    regenerations = 1000
+    t = best(path.regenerate, number=regenerations, repeat=1)
+    glFinish()
+
+    after = liveNames()
+    print(f"{regenerations} regenerations   {t * 1000:.3f} ms each   live gl names {before} -> {after}")
+    assert before == after, "path regeneration leaked gl objects"
+
+    path.release()
+    context.release()
+
+
+# vertices of fixed segments vs adaptive segments (at the default tolerance) on random paths
+def benchAdaptive(args):
+    tolerance = 0.005   # Path.tolerance default
+    for arcs, segments in ((8, 80), (300, 300)):
+        fixed = adaptive = 0
+        for i in range(100):
+            arcarray = randomArcs(arcs)
+            fixed += len(PathData.sample(arcarray, segments, None)[0])
+            adaptive += len(PathData.sample(arcarray, segments, tolerance)[0])
+
+        print(f"{arcs:4d} arcs x {segments:4d} segments   fixed {fixed // 100:7d} vertices   "
+              f"adaptive {adaptive // 100:7d} vertices   ({1 - adaptive / fixed:.0%} fewer, tolerance {tolerance})")
+
+
+# save and load (memory mapped) a million vertex path file, and its upload to the gpu
+def benchPathfile(args):
+    import tempfile
+    from components import pathfile
+
+    data = PathData.generate(3334, 300)     # 1000200 vertices
+    file = os.path.join(tempfile.mkdtemp(), "bench.rbz")
+
+    tsave = best(lambda: pathfile.save(file, data), repeat=3)
+    tload = best(lambda: pathfile.load(file).curve.sum(), repeat=5)   # sum touches every page of the map
+    tnpz = best(lambda: data.save(file + ".npz"), repeat=3)
+    tnpzload = best(lambda: PathData.load(file + ".npz").curve.sum(), repeat=5)
+
+    print(f"{len(data.curve)} vertices   {os.path.getsize(file) / 2**20:.1f} MiB")
+    print(f"rbz   save {tsave * 1000:7.2f} ms   load {tload * 1000:7.2f} ms")
+    print(f"npz   save {tnpz * 1000:7.2f} ms   load {tnpzload * 1000:7.2f} ms")
+
+    context = glContext()
+    from OpenGL.GL import glFinish
+    from components.path import Path
+
+    path = Path(pathfile.load(file))
+
+    def upload():
+        path.upload(pathfile.load(file))
+        glFinish()
+
+    print(f"rbz   load + upload {best(upload, repeat=5) * 1000:7.2f} ms")
+
+    path.release()
+    context.release()
+    os.remove(file)
+    os.remove(file + ".npz")
+
+
+# drawing a paths random numbers per arc (three draws an arc) vs all in one call, and getting a 3000 x 1000
+# path (3 million vertices) from a PathCache (in memory, spilled to disk and memory mapped back) vs generating it
+def benchCache(args):
+    import shutil
+    import tempfile
+    from components.pathcache import PathCache
+
+    for arcs in (8, 300, 3000):
+        def perArc():
+            rng = numpy.random.default_rng(1)
+            for arc in range(arcs):
+                rng.uniform(-5, 5, 3), rng.uniform(-4, 4, 3), rng.uniform(-5, 5, 3)
+
+        tarc = best(perArc)
+        tbatch = best(lambda: PathData.randomArcs(1, arcs, numpy.random.default_rng(1)))
+        print(f"{arcs:4d} arcs   random per arc {tarc * 1e6:8.1f} us   one call {tbatch * 1e6:6.1f} us")
+
+    spill = tempfile.mkdtemp()
+    settings = dict(arcs=3000, segments=1000, seed=1)
+    tgenerate = best(lambda: PathData.generate(**settings), repeat=3)
+
+    cache = PathCache(spill=spill)
+    cache.generate(**settings)
+    tmemory = best(lambda: cache.generate(**settings), number=1000)
+
+    def disk():
+        cache.clear()
+        cache.generate(**settings).curve.sum()     # sum touches every page of the map
+
+    cache.maxbytes = 0
+    cache.generate(**dict(settings, seed=2))    # pushes seed 1 out to disk
+    tdisk = best(disk)
+
+    same = numpy.array_equal(cache.generate(**settings).curve, PathData.generate(**settings).curve)
+    print(f"3000 x 1000 path   generate {tgenerate * 1000:7.2f} ms   memory hit {tmemory * 1e6:5.2f} us   "
+          f"disk hit {tdisk * 1000:6.2f} ms   (same path from the seed {same}, hits {dict(cache.hits)})")
+    shutil.rmtree(spill)
+
+
+# live feed throughput in arcs per second, frames of 1 to 256 arcs from a producer process into the feed
+# drained as fast as possible (socket and framing only), then into a scene adding them to its path once
+# a frame, the producer held back by the bounded queue (never more than maxarcs waiting)
+@restoresSettings
+def benchFeed(args):
+    import subprocess
+    import sys
+    import tempfile
+    from components.feed import PathFeed
+
+    address = os.path.join(tempfile.mkdtemp(), "feed.sock")
+    arcs = 100000
+
+    def producer(count, batch):
+        return subprocess.Popen([sys.executable, "rand-bezier.py", "feed", "--address", address, "--arcs", str(count),
+                                 "--batch", str(batch), "--rate", "0"], stdout=subprocess.DEVNULL)
+
+    feed = PathFeed(address, maxarcs=4096)
+    for batch in (1, 16, 256):
+        start, most = None, 0   # timed from the first arcs (not the producers startup)
+        process = producer(arcs, batch)
+        received = 0
+        while received < arcs:
+            most = max(most, feed.queued)
+            drained = feed.drain(2)
+            if drained is not None:
+                start = start or time.perf_counter()
+                received += len(drained[0])
+        t = time.perf_counter() - start
+        process.wait()
+        print(f"feed only   {batch:3d} arcs a frame   {arcs / t:9.0f} arcs/s   (most queued {most})")
+    feed.close()
+
+    import components.offscreen
+    from components.scene import Scene
+    from components.path import Path
+
+    Path.arcs, Path.arcsegments = 8, 80
+    scene = Scene(offscreen=True)
+    scene.turn = False
+    scene.listenFeed(address)
+    arcs = 20000
+    for batch in (1, 16, 256):
+        scene.path.regenerate()
+        before = len(scene.path.arcdata)
+        start, frames = time.perf_counter(), 0
+        process = producer(arcs, batch)
+        while len(scene.path.arcdata) < before + arcs:
+            scene.frame()
+            frames += 1
+        t = time.perf_counter() - start
+        process.wait()
+        print(f"scene       {batch:3d} arcs a frame   {arcs / t:9.0f} arcs/s   {frames / t:5.0f} fps   "
+              f"{arcs / frames:6.1f} arcs per frame")
+    scene.end()
+
+
+# morphing between two 3 million vertex paths (3000 x 1000 to 2000 x 1200, and the same counts), the one off
+# cost (resampling the old curve on the worker, uploading it) and a morph frame (one uniform on the gpu) vs
+# mixing the curves on the cpu and uploading them every frame
+def benchMorph(args):
+    import components.offscreen
+    from OpenGL.GL import glFinish
+    from components.scene import Scene
+    from components.path import Path
+    from components.worker import PathWorker
+
+    scene = Scene(offscreen=True)
+    scene.turn = False
+    scene.startTime = scene.clock() - 1e6   # whole path traced
+    scene.lod = scene.cull = False
+    old = PathData.generate(3000, 1000, seed=1)
+    scene.path.upload(old)
+    lengths = scene.path.lengths
+
+    for arcs, segments in ((2000, 1200), (3000, 1000)):
+        new = PathData.generate(arcs, segments, seed=2)
+        tresample = best(lambda: PathWorker.morphFrom(new, old.curve, lengths), repeat=3)
+        source = PathWorker.morphFrom(new, old.curve, lengths)
+
+        path = Path(new)
+        scene.path, scene.spare = path, scene.path
+
+        def start():
+            path.startMorph(source)
+            glFinish()
+
+        tstart = best(start, repeat=3)
+        scene.morphStart = scene.clock()
+        scene.morphTime = 1e6
+        tframe = best(lambda: (scene.render(), glFinish()), repeat=5)
+
+        def cpuMix():
+            mixed = new.curve + (source - new.curve) * 0.5
+            path.curvebuf.reset(mixed, cpu=False)
+            glFinish()
+
+        path.endMorph()
+        scene.morphStart = None
+        tmix = best(cpuMix, repeat=5)
+        tcpu = best(lambda: (cpuMix(), scene.render(), glFinish()), repeat=5)
+        print(f"{arcs} x {segments}   once: resample {tresample * 1000:7.2f} ms  start {tstart * 1000:5.2f} ms   "
+              f"a frame: gpu morph {tframe * 1000:6.2f} ms (one uniform)   "
+              f"cpu mix + upload {tcpu * 1000:7.2f} ms ({tmix * 1000:6.2f} ms mixing and uploading)")
+
+        scene.path, scene.spare = scene.spare, path
+        path.release()
+    scene.end()
+
+
+# memory held by a maximum size path (300 arcs x 300 segments), the original python lists
+# of floats plus glm array copies vs the float32 buffers of Path (with and without the cpu copy)
+@restoresSettings
+def benchMemory(args):
+    import tracemalloc
+    import glm
+
+    arcs, segments = 300, 300
+
+    # original Path storage (extending lists of floats, then glm.array(glm.float32, *list))
+    def lists():
+        points = [0, 0, 0]
+        points.extend(numpy.random.uniform(low=-5, high=5, size=3))
+        controls = list(numpy.random.uniform(low=-5, high=5, size=3))
+        curve = PathData.calcNew(points[0:3], controls[0:3], points[3:6], segments)
+        for i in range(1, arcs):
+            newpoint = numpy.random.uniform(low=-5, high=5, size=3)
+            newcontrol = numpy.random.uniform(low=-4, high=4, size=3)
+            curve.extend(PathData.calcNew(points[-3:], newcontrol, newpoint, segments))
+            points.extend(newpoint)
+            controls.extend(newcontrol)
+        return (curve, points, controls, glm.array(glm.float32, *curve),
+                glm.array(glm.float32, *points), glm.array(glm.float32, *controls))
+
+    # memory still held by what make returns, and the peak while making it
+    def measure(make):
+        tracemalloc.start()
+        kept = make()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del kept
+        return current, peak
+
+    context = glContext()
+    from components.path import Path
+    Path.arcs, Path.arcsegments = arcs, segments
+
+    def path(cpu):
+        Path.keepCpu = cpu
+        return Path()
+
+    for name, make in (("lists + glm arrays (original)", lists),
+                       ("Path, cpu copy", lambda: path(True)),
+                       ("Path, cpu copy dropped", lambda: path(False))):
+        current, peak = measure(make)
+        print(f"{name:32s} held {current / 2**20:7.2f} MiB   peak {peak / 2**20:7.2f} MiB")
+
+    print("(glm arrays are allocated outside the python allocator, so not counted)")
+    context.release()
+
+
+# generate, upload and draw times over a grid of path sizes, drawn by an offscreen scene
+# results can be written to json (--json file) to compare between commits
+SUITE_VERSION = 1
+SUITE_ARCS = (8, 50, 300)
+SUITE_SEGMENTS = (20, 80, 300)
+
+@restoresSettings
+def benchSuite(args):
+    import json
+    import platform
+    import components.offscreen
+    from OpenGL.GL import glFinish, glClear, glGetString, GL_RENDERER, GL_VERSION, GL_COLOR_BUFFER_BIT, GL_DEPTH_BUFFER_BIT
+    from components.scene import Scene
+    from components.path import Path
+
+    # pinned so the json compares between commits (whatever the defaults become)
+    Path.keepCpu, Path.compact, Path.adaptive, Path.gpuCurve, Path.degree, Path.nextSeed = True, False, False, False, 2, None
+
+    scene = Scene(offscreen=True)
+    scene.turn = False
+    scene.startTime = scene.clock() - 1e6   # whole path traced
+
+    def upload():
+        scene.path.upload(data)
+        glFinish()
+
+    def draw():
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        scene.render()
+        glFinish()
+
+    results = []
+    for arcs in SUITE_ARCS:
+        for segments in SUITE_SEGMENTS:
+            data = PathData.generate(arcs, segments)
+            vertices = len(data.curve)
+
+            tgenerate = best(lambda: PathData.generate(arcs, segments), number=10)
+            tupload = best(upload, number=10)
+            tdraw = best(draw, number=10)
+
+            results.append({"arcs": arcs, "segments": segments, "vertices": vertices,
+                            "generate_ms": round(tgenerate * 1000, 4), "upload_ms": round(tupload * 1000, 4),
+                            "draw_ms": round(tdraw * 1000, 4), "vertices_per_s": round(vertices / tdraw)})
+
+            print(f"{arcs:4d} arcs x {segments:4d} segments   generate {tgenerate * 1000:7.3f} ms   "
+                  f"upload {tupload * 1000:7.3f} ms   draw {tdraw * 1000:7.3f} ms   "
+                  f"{vertices / tdraw / 1e6:7.2f} M vertices/s")
+
+    machine = {"renderer": glGetString(GL_RENDERER).decode(), "gl": glGetString(GL_VERSION).decode(),
+               "python": platform.python_version(), "numpy": numpy.__version__, "platform": platform.platform()}
+    scene.end()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"version": SUITE_VERSION, "unit": "ms", "machine": machine, "results": results},
+                      f, indent=1, sort_keys=True)
+            f.write("\n")
+        print(f"written {args.json}")
+
+
+# per frame trace lookup (distance to vertex and partial segment) on paths up to a million vertices,
+# a binary search of the arc length table so the cost barely grows with the path, and appending an arc
+# (Keep/Grow, the live feed), which only writes the new rows of the paths tables and buffers
+@restoresSettings
+def benchTrace(args):
+    context = glContext()
+    from components.path import Path
+
+    for arcs, segments in ((8, 80), (300, 300), (3334, 300)):
+        Path.arcs, Path.arcsegments = arcs, segments
+        path = Path()
+        distances = numpy.random.uniform(0, path.length(), 1000)
+
+        def trace():
+            for distance in distances:
+                path.trace(distance)
+
+        t = best(trace, repeat=5) / len(distances)
+        tappend = best(lambda: path.append_arcs(1), repeat=20)
+        print(f"{path.curveVertices():8d} vertices   trace {t * 1e6:6.2f} us   append an arc {tappend * 1000:6.3f} ms")
+        path.release()
+
+    context.release()
+
+
+# many paths (8 arcs x 80 segments) drawn as separate Paths (a vao bind and draw each) vs one
+# PathCollection multi draw, cpu time to issue the draws and total frame time (until the gpu
+# finishes), as paths per frame that fit in a 60 fps frame (16.7 ms)
+def benchCollection(args):
+    import components.offscreen
+    from OpenGL.GL import glFinish, glBindVertexArray, glDrawArrays, glUseProgram, GL_LINE_STRIP
+    from components import batch
+    from components.scene import Scene
+    from components.path import Path
+    from components.pathdata import PathData
+    from components.collection import PathCollection
+
+    scene = Scene(offscreen=True)
+    glUseProgram(scene.path_shader)
+
+    # best cpu time issuing draw() and time until the gpu has finished it
+    def frame(draw):
+        times = []
+        for i in range(5):
+            start = time.perf_counter()
+            draw()
+            issued = time.perf_counter()
+            glFinish()
+            times.append((issued - start, time.perf_counter() - start))
+        return min(times, key=lambda t: t[1])
+
+    def report(name, count, t):
+        return (f"{name} issue {t[0] * 1000:7.3f} ms  frame {t[1] * 1000:7.2f} ms "
+                f"({count * (1 / 60) / t[1]:5.0f} paths/frame at 60 fps)")
+
+    for count in (100, 1000, 5000):
+        points, controls, curve = batch.generateChunk((count, 8, 80, count, 2))
+
+        collection = PathCollection()
+        collection.addBatch(points, controls, curve)
+
+        def multi():
+            glBindVertexArray(collection.pathvao)
+            collection.drawCurves()
+
+        line = f"{count:5d} paths   " + report("multi draw", count, frame(multi))
+
+        # separate paths (only up to a thousand, each has its own gl objects)
+        if count <= 1000:
+            offsets = numpy.arange(9) * 80
+            paths = [Path(PathData(points[i], controls[i], curve[i], offsets, 80)) for i in range(count)]
+
+            def separate():
+                for path in paths:
+                    glBindVertexArray(path.pathvao)
+                    glDrawArrays(GL_LINE_STRIP, 0, path.curveVertices())
+
+            line += "   " + report("separate", count, frame(separate))
+            for path in paths:
+                path.release()
+
+        print(line)
+        collection.release()
+
+    scene.end()
+
+
+# frustum culling (vertices drawn and cost per frame) zoomed out and in, bvh picking of points/controls
+# under random pixels and the nearest arc to random points, against (and checked by) a numpy scan of
+# every point/control or curve vertex, on 300 and 3000 arc paths
+@restoresSettings
+def benchBounds(args):
+    import components.offscreen
+    from components.scene import Scene
+    from components.path import Path
+
+    scene = Scene(offscreen=True)
+    scene.turn = False
+
+    for arcs in (300, 3000):
+        Path.arcs, Path.arcsegments = arcs, 80
+        scene.path.regenerate()
+        path = scene.path
+        n = path.curveVertices()
+
+        for zoom in (0.92, 4.0):
+            scene.scaleCamera = zoom
+            scene.render()
+            viewproj = numpy.array(scene.proj * scene.view)
+            tcull = best(lambda: path.draws(n, viewproj), number=100)
+            (vao, first, counts), = path.draws(n, viewproj)
+            print(f"{arcs:5d} arcs  zoom {zoom:4.2f}   cull {tcull * 1e6:7.1f} us   "
+                  f"drawn {counts.sum():7d} of {n} vertices in {len(counts)} draws")
+
+        # points/controls under random pixels by the bvh vs checking every one of them (numpy)
+        spots = numpy.concatenate((path.arcdata[:, 0], path.arcdata[-1:, -1], path.arcdata[:, 1:-1].reshape(-1, 3)))
+        def everySpot(origin, direction, radius=0.15):
+            direction = numpy.asarray(direction) / numpy.linalg.norm(direction)
+            offsets = spots - origin
+            along = offsets @ direction
+            miss = numpy.einsum("ij,ij->i", offsets, offsets) - along * along
+            along[(along < 0) | (miss > radius * radius)] = numpy.inf
+            spot = int(numpy.argmin(along))
+            if along[spot] == numpy.inf:
+                return None
+            return ("point", spot) if spot < len(path.arcdata) + 1 else ("control", spot - len(path.arcdata) - 1)
+
+        path.tree = None
+        tbuild = best(lambda: path.pick((0, 0, 1), (0, 0, -1), 0.1), repeat=1)
+        rays = [scene.ray(x, y) for x, y in numpy.random.uniform((0, 0), (Scene.WIDTH - 220, Scene.HEIGHT), (100, 2))]
+        picks = [path.pick(*ray, 0.15) for ray in rays]
+        assert picks == [everySpot(*ray) for ray in rays], "bvh pick disagrees with checking every point/control"
+        tpick = best(lambda: [path.pick(*ray, 0.15) for ray in rays], repeat=3) / len(rays)
+        tevery = best(lambda: [everySpot(*ray) for ray in rays], repeat=3) / len(rays)
+        print(f"{arcs:5d} arcs   pick    {tpick * 1000:6.3f} ms   every point {tevery * 1000:6.3f} ms   "
+              f"bvh build {tbuild * 1000:6.2f} ms   ({sum(p is not None for p in picks)} of {len(rays)} random pixels on a point/control)")
+
+        # nearest arc to random points by the bvh vs the distance to every curve vertex
+        queries = numpy.random.uniform(-6, 6, (100, 3))
+        curve = path.curve.reshape(-1, 3).astype(numpy.float64)
+        brute = lambda point: numpy.linalg.norm(curve - point, axis=1).min()
+        path.pieces = None
+        tbuild = best(lambda: path.nearest((0, 0, 0)), repeat=1)
+        tnearest = best(lambda: [path.nearest(point) for point in queries], repeat=3) / len(queries)
+        tbrute = best(lambda: [brute(point) for point in queries], repeat=3) / len(queries)
+        error = max(abs(path.nearest(point)[1] - brute(point)) for point in queries)
+        print(f"{arcs:5d} arcs   nearest {tnearest * 1000:6.3f} ms   every vertex {tbrute * 1000:6.3f} ms   "
+              f"bvh build {tbuild * 1000:6.2f} ms   largest difference {error:.1e}")
+        assert error < 1e-9, "bvh nearest arc disagrees with the brute force search"
+
+    scene.end()
+
+
+# largest distance (pixels) the lines of each arc at its level are off the curve on screen, the
+# curve is furthest from a line halfway along it (in t), compared after projecting both (where
+# both are between the near and far planes, the rest is clipped), only arcs on coarser levels are
+# checked (level 0 is the curve as drawn without lod, arcs right by the camera can be off more than that)
+def lodError(path, level, viewproj, height):
+    arcs = path.arcdata
+    counts = (path.lodEnds.view() - path.lodOffsets.view())[numpy.arange(len(arcs)), level]
+    worst = 0.0
+    for arc, count in zip(arcs[level > 0], counts[level > 0]):
+        t = numpy.linspace(0, 1, count)
+        mid = (t[1:] + t[:-1]) / 2
+        at = lambda t: ((1 - t) ** 2)[:, None] * arc[0] + (2 * (1 - t) * t)[:, None] * arc[1] + (t * t)[:, None] * arc[2]
+        ends = at(t)
+        chord, curve = (ends[1:] + ends[:-1]) / 2, at(mid)
+
+        clip = [numpy.c_[p, numpy.ones(len(p))] @ viewproj.T for p in (chord, curve)]
+        shown = numpy.logical_and.reduce([numpy.abs(c[:, 2]) <= c[:, 3] for c in clip])
+        if shown.any():
+            a, b = (c[shown, :2] / c[shown, 3:] * height / 2 for c in clip)
+            worst = max(worst, numpy.linalg.norm(a - b, axis=1).max())
+    return worst
+
+
+# screen space level of detail, vertices drawn (and draw time) with and without lod on a 300 arc
+# path at 1000 segments per arc zoomed out, as it starts and in close, and the worst error on screen
+@restoresSettings
+def benchLod(args):
+    import components.offscreen
+    from OpenGL.GL import glFinish
+    from components.scene import Scene
+    from components.path import Path
+
+    scene = Scene(offscreen=True)
+    scene.turn = False
+    Path.arcs, Path.arcsegments, Path.nextSeed = 300, 1000, 1
+    scene.path.regenerate()
+    path = scene.path
+    n = path.curveVertices()
+
+    for zoom in (0.1, 0.92, 4.0):
+        scene.scaleCamera = zoom
+        scene.render()
+        viewproj = numpy.array(scene.proj * scene.view)
+
+        line = f"zoom {zoom:4.2f}"
+        for lod in (False, True):
+            scene.lod = lod
+            tdraw = best(lambda: (scene.render(), glFinish()), repeat=5)
+            draws = path.draws(n, viewproj, scene.lodPixels if lod else None, Scene.HEIGHT)
+            vertices = sum(int(counts.sum()) for vao, first, counts in draws)
+            line += f"   {'lod' if lod else 'full'} {vertices:7d} vertices {tdraw * 1000:6.2f} ms"
+
+        levels = path.lodLevels(viewproj, scene.lodPixels, Scene.HEIGHT)
+        error = lodError(path, levels, viewproj, Scene.HEIGHT)
+        print(f"{line}   (levels {levels.min()}-{levels.max()}, worst error {error:.3f} px of {scene.lodPixels})")
+
+    # a growing path (an arc appended every frame, Keep/Grow or the live feed) only evaluates the levels of
+    # the new arcs, the same vertices are drawn as from levels built again from scratch
+    scene.scaleCamera, scene.lod = 0.92, True
+    tstatic = best(lambda: (scene.render(), glFinish()), repeat=20)
+    tgrow = best(lambda: (path.append_arcs(1), scene.render(), glFinish()), repeat=20)
+    viewproj = numpy.array(scene.proj * scene.view)
+    drawn = lambda: sum(int(counts.sum()) for vao, first, counts in path.draws(path.curveVertices(), viewproj, scene.lodPixels, Scene.HEIGHT))
+    extended, chunks = drawn(), len(path.lodChunks)
+    path.lodOffsets = None
+    assert drawn() == extended, "extended levels draw other vertices than levels built from scratch"
+    levels = path.lodLevels(viewproj, scene.lodPixels, Scene.HEIGHT)
+    error = lodError(path, levels, viewproj, Scene.HEIGHT)
+    print(f"growing   frame {tgrow * 1000:6.2f} ms (static {tstatic * 1000:6.2f} ms)   {chunks} chunks of levels   "
+          f"worst error {error:.3f} px of {scene.lodPixels}")
+
+    scene.end()
+
+
+# float32 vs compact (int16) curves, upload time and bandwidth, gpu memory and draw time of a
+# 3 million vertex path and a 5000 path collection, with the largest error of the compact positions
+# (read back) against the float32 reference, which has to be within half a step of the quantization
+# (and float32 rounding), the compact curves are packed when generated (the paths on the worker, shown
+# on its own, the collections in batch.generateChunk) so their upload is only the int16 bytes
+@restoresSettings
+def benchCompact(args):
+    import components.offscreen
+    from OpenGL.GL import glFinish
+    from components import batch
+    from components.quant import quantize
+    from components.scene import Scene
+    from components.path import Path
+    from components.collection import PathCollection
+
+    scene = Scene(offscreen=True)
+    scene.turn = False
+    scene.startTime = scene.clock() - 1e6   # whole path traced
+    scene.lod = scene.cull = False
+
+    Path.arcs, Path.arcsegments = 3000, 1000
+    data = PathData.generate(Path.arcs, Path.arcsegments, seed=1)
+    reference = data.curve.reshape(-1)
+
+    for compact in (False, True):
+        if compact:
+            data.pack()
+            tpack = best(lambda: quantize(data.curve, data.quant), repeat=5)
+        path = scene.path
+        path.upload(data)
+
+        def upload():
+            path.curvebuf.reset(data.packed if compact else reference, cpu=False, quant=path.quant)
+            glFinish()
+
+        tupload = best(upload, repeat=5)
+        tdraw = best(lambda: (scene.render(), glFinish()), repeat=5)
+        size = path.curvebuf.bytes()
+
+        line = (f"{'compact' if compact else 'float32'} path   {len(reference) // 3} vertices   {size / 2**20:6.1f} MiB   "
+                f"upload {tupload * 1000:7.2f} ms   draw {tdraw * 1000:6.2f} ms")
+        if compact:
+            error = numpy.abs(path.curve - reference).reshape(-1, 3).max(axis=0)
+            bound = path.quant[1] / 2 + numpy.spacing(numpy.float32(numpy.abs(reference).max())) * 2
+            line += (f"   (packed on the worker {tpack * 1000:6.2f} ms)   error {error.max():.2e} "
+                     f"(bound {bound.max():.2e}, {'ok' if (error <= bound).all() else 'OVER'})")
+        print(line)
+
+    Path.compact = False
+    Path.arcs, Path.arcsegments = 8, 80
+
+    points, controls, curve = batch.generateChunk((5000, 8, 80, 1, 2))
+    for compact in (False, True):
+        collection = PathCollection(compact)
+
+        # compact curves packed where they're generated (batch.generateChunk with the collections quant)
+        task = (5000, 8, 80, 1, 2)
+        tgenerate = best(lambda: batch.generateChunk(task, collection.quant), repeat=3)
+        uploaded = batch.generateChunk(task, collection.quant)[2]
+
+        def fill():
+            collection.clear()
+            collection.addBatch(points, controls, uploaded)
+            glFinish()
+
+        tupload = best(fill, repeat=5)
+        size = collection.curvebuf.bytes()
+        line = (f"{'compact' if compact else 'float32'} collection   {len(collection)} paths   {size / 2**20:6.1f} MiB   "
+                f"upload {tupload * 1000:7.2f} ms   (generated {tgenerate * 1000:6.2f} ms)")
+        if compact:
+            error = numpy.abs(collection.curvebuf.view() - curve.reshape(-1)).max()
+            bound = collection.quant[1].max() / 2 + numpy.spacing(numpy.float32(PathCollection.extent)) * 2
+            line += f"   error {error:.2e} (bound {bound:.2e}, {'ok' if error <= bound else 'OVER'})"
+        print(line)
+        collection.release()
+
+    scene.end()
+
+
+# startup of an offscreen scene in a new process, cold (empty shader caches) then warm (cached
+# program binaries), times of the imports, scene setup and its first frame
+STARTUP = """
+import time, json
+start = time.perf_counter()
+import components.offscreen
+from components.scene import Scene
+from OpenGL.GL import glFinish
+imported = time.perf_counter()
+scene = Scene(offscreen=True)
+glFinish()
+setup = time.perf_counter()
+scene.frame()
+glFinish()
+frame = time.perf_counter()
+print(json.dumps([imported - start, setup - imported, frame - setup]))
+scene.end()
+"""
+
+def benchStartup(args):
+    import json
+    import subprocess
+    import sys
+    import tempfile
+
+    env = dict(os.environ, XDG_CACHE_HOME=tempfile.mkdtemp())     # own shader caches (ours and the drivers)
+
+    def run():
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", STARTUP], env=env, capture_output=True, text=True, check=True).stdout
+        first = time.perf_counter() - start
+        return [first] + json.loads(output.splitlines()[-1])
+
+    for name in ("cold", "warm", "warm"):
+        first, imported, setup, frame = run()
+        print(f"{name}   first frame {first * 1000:7.1f} ms   (imports {imported * 1000:6.1f} ms   "
+              f"scene setup {setup * 1000:6.1f} ms   frame {frame * 1000:6.1f} ms, rest is python startup)")
+
+
+BENCHES = {
+    "evaluate": benchEvaluate,
+    "gpucurve": benchGpuCurve,
+    "degree": benchDegree,
+    "regenerate": benchRegenerate,
+    "adaptive": benchAdaptive,
+    "pathfile": benchPathfile,
+    "memory": benchMemory,
+    "suite": benchSuite,
+    "trace": benchTrace,
+    "collection": benchCollection,
+    "bounds": benchBounds,
+    "lod": benchLod,
+    "compact": benchCompact,
+    "cache": benchCache,
+    "feed": benchFeed,
+    "morph": benchMorph,
+    "startup": benchStartup,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="random-bezier benchmarks")
+    parser.add_argument("bench", nargs="*", help=f"benchmarks to run (default all): {', '.join(BENCHES)}")
+    parser.add_argument("--json", help="write the suite results to this json file")
+    args = parser.parse_args()
+
+    unknown = set(args.bench) - set(BENCHES)
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(sorted(unknown))}")
+
+    for name in args.bench or BENCHES:
+        print(f"-- {name}")
+        BENCHES[name](args)
@@ -0,0 +1,82 @@
+import collections
+import os
+import time
+import numpy
+from multiprocessing import Pool
+
+from components import bezier
+from components.pathdata import PathData
+from components.quant import quantize
+
+# offline generation of many random paths (no opengl), spread over a process pool
+# and written out chunk by chunk so memory stays bounded however many paths are made
+
+
+# points, controls and curves of count paths (arcs of degree) from one seed (runs in a worker process)
+# with quant ((offset, scale), eg. a compact PathCollection's) the curves are packed as int16 here
+# rather than where they're uploaded
+def generateChunk(task, quant=None):
+    count, arcs, segments, seed, degree = task
+    rng = numpy.random.default_rng(seed)
+
+    # every arc of every path evaluated in one go
+    points, controls = PathData.randomArcs(count, arcs, rng, degree=degree)
+    curve = bezier.evaluate(bezier.arcsFrom(points, controls, degree).reshape(-1, degree + 1, 3), segments)
+    if quant is not None:
+        curve = quantize(curve, quant)
+
+    return points, controls, curve.reshape(count, arcs * segments, 3)
+
+
+# generate count paths into out (a directory), either one .npz per chunk (fmt "npz")
+# or points/controls/curve .npy files filled in a chunk at a time (fmt "npy")
+# each chunk has its own seed spawned from seed, so the output only depends on the
+# seed and chunk size, not on the number of workers
+# returns paths per second
+def generate(count, arcs, segments, seed, workers, out, chunk=1000, fmt="npz", degree=2):
+    os.makedirs(out, exist_ok=True)
+
+    sizes = [min(chunk, count - start) for start in range(0, count, chunk)]
+    seeds = numpy.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(size, arcs, segments, s, degree) for size, s in zip(sizes, seeds)]
+
+    if fmt == "npy":
+        files = {
+            "points": numpy.lib.format.open_memmap(os.path.join(out, "points.npy"), mode="w+",
+                                                   dtype=numpy.float32, shape=(count, arcs + 1, 3)),
+            "controls": numpy.lib.format.open_memmap(os.path.join(out, "controls.npy"), mode="w+",
+                                                     dtype=numpy.float32, shape=(count, arcs * (degree - 1), 3)),
+            "curve": numpy.lib.format.open_memmap(os.path.join(out, "curve.npy"), mode="w+",
+                                                  dtype=numpy.float32, shape=(count, arcs * segments, 3)),
+        }
+
+    # write a finished chunk
+    def write(i, points, controls, curve):
+        if fmt == "npy":
+            files["points"][i * chunk:i * chunk + len(points)] = points
+            files["controls"][i * chunk:i * chunk + len(points)] = controls
+            files["curve"][i * chunk:i * chunk + len(points)] = curve
+        else:
+            numpy.savez(os.path.join(out, f"paths_{i:05d}.npz"), points=points, controls=controls, curve=curve)
+
+    start = time.perf_counter()
+
+    with Pool(workers) as pool:
+        # a couple of chunks per worker in flight, written in order as they finish
+        # (so only those chunks are ever held in memory)
+        pending = collections.deque()
+        for i, task in enumerate(tasks):
+            pending.append((i, pool.apply_async(generateChunk, (task,))))
+            if len(pending) > 2 * workers:
+                n, result = pending.popleft()
+                write(n, *result.get())
+
+        while pending:
+            n, result = pending.popleft()
+            write(n, *result.get())
+
+    if fmt == "npy":
+        for f in files.values():
+            f.flush()
+
+    return count / (time.perf_counter() - start)
@@ -0,0 +1,128 @@
+import functools
+import numpy
+from math import comb
+
+# batched bezier maths for whole paths (no opengl, just numpy arrays)
+# arcs of any degree, an arc of degree d is its start, d - 1 controls and its end (d + 1 points)
+
+
+# builds the (arcs, degree + 1, 3) array of [start, controls..., end] for every arc of a path
+# from its endpoints (arcs + 1 points) and controls (degree - 1 per arc, in order)
+# also works on many paths at once, (paths, arcs + 1, 3) points give (paths, arcs, degree + 1, 3)
+def arcsFrom(points, controls, degree=2):
+    points = numpy.asarray(points, dtype=numpy.float64)
+    controls = numpy.asarray(controls, dtype=numpy.float64)
+    if points.ndim == 1:    # flat xyz lists
+        points = points.reshape(-1, 3)
+        controls = controls.reshape(-1, 3)
+
+    count = points.shape[-2] - 1
+    arcs = numpy.empty(points.shape[:-2] + (count, degree + 1, 3), dtype=numpy.float64)
+    arcs[..., 0, :] = points[..., :-1, :]   # start of each arc is the previous endpoint
+    arcs[..., 1:-1, :] = controls.reshape(points.shape[:-2] + (count, degree - 1, 3))
+    arcs[..., -1, :] = points[..., 1:, :]
+    return arcs
+
+
+# bernstein weights of every point of a degree arc at each t, (len(t), degree + 1)
+def weights(degree, t):
+    t = numpy.asarray(t, dtype=numpy.float64)[:, None]
+    k = numpy.arange(degree + 1)
+    binomial = numpy.array([comb(degree, i) for i in k], dtype=numpy.float64)
+    return binomial * t ** k * (1 - t) ** (degree - k)
+
+
+# (segments, degree + 1) weights of segments evenly spaced samples (t 0 to 1), kept for the
+# last few settings so evaluating paths again at the same settings reuses it (read only)
+@functools.lru_cache(maxsize=16)
+def basis(degree, segments):
+    matrix = weights(degree, numpy.arange(segments) / (segments - 1))
+    matrix.setflags(write=False)
+    return matrix
+
+
+# every arc at once, the basis matrix times each arcs points (the same curve PathData.calcNew
+# steps out one vertex at a time for quadratics)
+# returns the (arcs * segments, 3) float32 vertex buffer ready for upload
+def evaluate(arcs, segments):
+    arcs = numpy.asarray(arcs, dtype=numpy.float64)
+    verts = numpy.matmul(basis(arcs.shape[1] - 1, segments), arcs)   # (arcs, segments, 3)
+    return verts.reshape(-1, 3).astype(numpy.float32)
+
+
+# how much each arc bends, a bound on half its second derivative (for a quadratic |p0 - 2p1 + p2|, constant)
+# degree d (d - 1)/2 times the largest second difference of its points, n uniform lines are off
+# the curve by at most bend / 4n^2
+def bend(arcs):
+    arcs = numpy.asarray(arcs, dtype=numpy.float64)
+    degree = arcs.shape[1] - 1
+    if degree < 2:
+        return numpy.zeros(len(arcs))
+    second = arcs[:, :-2] - 2 * arcs[:, 1:-1] + arcs[:, 2:]
+    return degree * (degree - 1) / 2 * numpy.linalg.norm(second, axis=2).max(axis=1)
+
+
+# samples needed per arc so the line segments stay within tolerance of the curve
+# (see bend), clamped to 2..maxsegments
+def adaptiveSegments(arcs, tolerance, maxsegments):
+    lines = numpy.ceil(numpy.sqrt(bend(arcs) / (4 * tolerance)))
+    return numpy.clip(lines + 1, 2, maxsegments).astype(numpy.int64)
+
+
+# like evaluate but each arc has its own number of samples (counts)
+# returns the float32 vertex buffer and the vertex offset of every arc (arcs + 1, last is the total)
+def evaluateCounts(arcs, counts):
+    arcs = numpy.asarray(arcs, dtype=numpy.float64)
+    counts = numpy.asarray(counts, dtype=numpy.int64)
+
+    offsets = numpy.zeros(len(counts) + 1, dtype=numpy.int64)
+    numpy.cumsum(counts, out=offsets[1:])
+
+    # arc and position along it of every vertex, weighted sum of its arcs points
+    arc = numpy.repeat(numpy.arange(len(counts)), counts)
+    i = numpy.arange(offsets[-1]) - offsets[arc]
+    w = weights(arcs.shape[1] - 1, i / (counts[arc] - 1))
+
+    verts = numpy.zeros((len(arc), 3))
+    for k in range(arcs.shape[1]):
+        verts += w[:, k, None] * arcs[arc, k]
+
+    return verts.astype(numpy.float32), offsets
+
+
+# distance along a polyline to each of its vertices (first is 0, last is the total length)
+# a cumulative table to look distances up in with a binary search
+def arcLengths(verts):
+    verts = numpy.asarray(verts, dtype=numpy.float64).reshape(-1, 3)
+    lengths = numpy.zeros(len(verts))
+    numpy.cumsum(numpy.linalg.norm(numpy.diff(verts, axis=0), axis=1), out=lengths[1:])
+    return lengths
+
+
+# positions at distances along a polyline (its vertices and their distances along it, see arcLengths)
+def resample(verts, lengths, distances):
+    verts = numpy.asarray(verts).reshape(-1, 3)
+    return numpy.stack([numpy.interp(distances, lengths, verts[:, axis]) for axis in range(3)], axis=1).astype(numpy.float32)
+
+
+# point at t on one [start, controls..., end] arc (de casteljau, quicker than weights for one point)
+def at(arc, t):
+    p = numpy.asarray(arc)
+    while len(p) > 1:
+        p = (1 - t) * p[:-1] + t * p[1:]
+    return p[0]
+
+
+# line from vertex k of an arc sampled with count vertices, fraction f of the way to vertex k + 1
+# (the partly traced segment at the end of a trace), returns its start and end points
+def partialSegment(arc, k, count, f):
+    start = at(arc, k / (count - 1))
+    end = at(arc, (k + 1) / (count - 1))
+    return start, start + f * (end - start)
+
+
+# axis aligned box of every arc, (arcs, 2, 3) min and max corners
+# (a bezier lies inside the hull of its points, so inside their box)
+def arcBounds(arcs):
+    arcs = numpy.asarray(arcs, dtype=numpy.float64)
+    return numpy.stack((arcs.min(axis=1), arcs.max(axis=1)), axis=1)
@@ -0,0 +1,196 @@
+import numpy
+from OpenGL.GL import *
+
+from components.quant import quantize, dequantize
+
+
+# point a vao at a buffer of xyz float positions (attribute 0), or int16 positions when compact
+# (converted to floats as they are, the shader scales them back, see quantization)
+def vertexArray(vao, vbo, compact=False):
+    glBindVertexArray(vao)
+    glBindBuffer(GL_ARRAY_BUFFER, vbo)
+    glEnableVertexAttribArray(0)
+    glVertexAttribPointer(0, 3, GL_SHORT if compact else GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(0))
+    glBindVertexArray(0)
+    glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+
+# vertex buffer (and its vao) that can be appended to, storage doubles when full
+# so appending is only the cost of the new vertices (glBufferSubData)
+# keeps a cpu copy of the floats in the same layout as the gpu buffer, unless cpu is
+# False, then the floats only live on the gpu (read back when asked for)
+# with a quantization (see reset) positions are stored as int16, half the size of floats
+class GrowableBuffer():
+
+    __slots__ = ("vao", "vbo", "count", "capacity", "cpu", "data", "quant", "dtype")
+
+    def __init__(self, vao, vbo, data=None, capacity=1024, cpu=True):
+        self.vao = vao
+        self.vbo = vbo
+
+        self.count = 0      # floats in use
+        self.capacity = 0   # floats allocated
+        self.cpu = cpu
+        self.quant = None   # (offset, scale) when compact
+        self.dtype = numpy.dtype(numpy.float32)
+        self.data = numpy.empty(0, dtype=self.dtype) if cpu else None
+
+        # vao attribute for position (stays valid when the storage grows, same vbo)
+        vertexArray(self.vao, self.vbo)
+
+        data = numpy.empty(0, dtype=numpy.float32) if data is None else data
+        self.reserve(max(capacity, data.size))
+        self.append(data)
+
+
+    # used floats (cpu copy, or read back from the gpu without one), compact positions as floats again
+    def view(self):
+        if self.cpu:
+            values = self.data[:self.count]
+        else:
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+            values = numpy.frombuffer(glGetBufferSubData(GL_ARRAY_BUFFER, 0, self.count * self.dtype.itemsize),
+                                      dtype=self.dtype)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        return values if self.quant is None else dequantize(values, self.quant)
+
+
+    # bytes of gpu storage in use
+    def bytes(self):
+        return self.count * self.dtype.itemsize
+
+
+    # number of xyz vertices in use
+    def vertices(self):
+        return self.count // 3
+
+
+    # make room for at least capacity floats, doubling so repeated appends are amortised
+    def reserve(self, capacity):
+        if capacity <= self.capacity:
+            return
+
+        newcapacity = max(capacity, self.capacity * 2)
+
+        if self.cpu:
+            # grow cpu copy
+            data = numpy.empty(newcapacity, dtype=self.dtype)
+            data[:self.count] = self.data[:self.count]
+            self.data = data
+
+            # reallocate the gpu storage (same buffer name) and reupload what is in use
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+            glBufferData(GL_ARRAY_BUFFER, newcapacity * self.dtype.itemsize, None, GL_DYNAMIC_DRAW)
+            if self.count:
+                glBufferSubData(GL_ARRAY_BUFFER, 0, self.count * self.dtype.itemsize, self.data[:self.count])
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        else:
+            # no cpu copy, floats in use are copied on the gpu through a temporary buffer
+            temp = glGenBuffers(1) if self.count else None
+            if temp is not None:
+                glBindBuffer(GL_COPY_WRITE_BUFFER, temp)
+                glBufferData(GL_COPY_WRITE_BUFFER, self.count * self.dtype.itemsize, None, GL_STREAM_COPY)
+                glBindBuffer(GL_COPY_READ_BUFFER, self.vbo)
+                glCopyBufferSubData(GL_COPY_READ_BUFFER, GL_COPY_WRITE_BUFFER, 0, 0, self.count * self.dtype.itemsize)
+
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+            glBufferData(GL_ARRAY_BUFFER, newcapacity * self.dtype.itemsize, None, GL_DYNAMIC_DRAW)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+            if temp is not None:
+                glBindBuffer(GL_COPY_READ_BUFFER, temp)
+                glBindBuffer(GL_COPY_WRITE_BUFFER, self.vbo)
+                glCopyBufferSubData(GL_COPY_READ_BUFFER, GL_COPY_WRITE_BUFFER, 0, 0, self.count * self.dtype.itemsize)
+                glBindBuffer(GL_COPY_READ_BUFFER, 0)
+                glBindBuffer(GL_COPY_WRITE_BUFFER, 0)
+                glDeleteBuffers(1, (temp,))
+
+        self.capacity = newcapacity
+
+
+    # replace the contents with new floats, keeping the buffer (and its capacity)
+    # the old storage is orphaned so the gpu never waits on draws still using it
+    # cpu picks whether a cpu copy is kept from now on, and quant (offset, scale) stores positions
+    # as int16 from now on (None for floats)
+    def reset(self, floats=None, cpu=True, quant=None):
+        floats = numpy.empty(0, dtype=numpy.float32) if floats is None else floats
+        self.count = 0
+
+        dtype = numpy.dtype(numpy.float32 if quant is None else numpy.int16)
+        if dtype != self.dtype:
+            vertexArray(self.vao, self.vbo, compact=quant is not None)
+        self.quant = quant
+
+        if cpu != self.cpu or dtype != self.dtype:
+            self.cpu = cpu
+            self.dtype = dtype
+            self.data = numpy.empty(self.capacity, dtype=dtype) if cpu else None
+
+        if floats.size > self.capacity:
+            self.reserve(floats.size)
+        else:
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+            glBufferData(GL_ARRAY_BUFFER, self.capacity * dtype.itemsize, None, GL_DYNAMIC_DRAW)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        self.append(floats)
+
+
+    # add floats to the end of the buffer, only the new floats are uploaded
+    # (int16 values for a compact buffer are taken as already quantized with its quant, eg. PathData.packed)
+    def append(self, floats):
+        if self.quant is not None and floats.dtype == numpy.int16:
+            floats = numpy.ascontiguousarray(floats).reshape(-1)
+        else:
+            floats = numpy.ascontiguousarray(floats, dtype=numpy.float32).reshape(-1)
+            if self.quant is not None:
+                floats = quantize(floats, self.quant)
+        if not floats.size:
+            return
+
+        self.reserve(self.count + floats.size)
+
+        start = self.count
+        if self.cpu:
+            self.data[start:start + floats.size] = floats
+        self.count += floats.size
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferSubData(GL_ARRAY_BUFFER, start * self.dtype.itemsize, floats.nbytes, floats)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+
+# cpu array of rows (eg. a table with a row per arc) that can be appended to, storage doubles when
+# full like GrowableBuffer so appending is only the cost of the new rows, view() is the rows in use
+# (reset makes new storage, views of the old rows stay as they were)
+class GrowableArray():
+
+    __slots__ = ("data", "count")
+
+    def __init__(self, rows=None):
+        self.reset(numpy.empty(0) if rows is None else rows)
+
+
+    def view(self):
+        return self.data[:self.count]
+
+
+    # replace the rows (copied)
+    def reset(self, rows):
+        rows = numpy.asarray(rows)
+        self.data = numpy.empty((max(len(rows), 16),) + rows.shape[1:], dtype=rows.dtype)
+        self.data[:len(rows)] = rows
+        self.count = len(rows)
+
+
+    # add rows to the end (same shape and dtype as the rows already there)
+    def append(self, rows):
+        if self.count + len(rows) > len(self.data):
+            data = numpy.empty((max(self.count + len(rows), len(self.data) * 2),) + self.data.shape[1:], dtype=self.data.dtype)
+            data[:self.count] = self.data[:self.count]
+            self.data = data
+
+        self.data[self.count:self.count + len(rows)] = rows
+        self.count += len(rows)
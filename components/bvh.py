@@ -0,0 +1,157 @@
+import heapq
+import math
+import numpy
+
+# bounding volume hierarchy over axis aligned boxes (eg. the points of a path, or pieces of its curve),
+# so ray and nearest queries only look at the few boxes near them (logarithmic in the number of boxes)
+# instead of all of them
+# built top down, each node split at the median of its boxes centres along its longest axis
+class BVH():
+
+    leafsize = 4    # most boxes in a leaf node
+
+    # boxes (n, 2, 3) min and max corners, leafsize the most in a leaf (bigger leaves suit queries
+    # that test a leafs boxes all at once)
+    def __init__(self, boxes, leafsize=None):
+        boxes = numpy.asarray(boxes, dtype=numpy.float64)
+        self.boxes = boxes
+        self.leafsize = BVH.leafsize if leafsize is None else leafsize
+        self.order = numpy.arange(len(boxes))   # boxes ordered so every leaf is a contiguous run
+
+        # nodes, box corners and either two children or a run of order (children are -1)
+        self.lo, self.hi, self.left, self.right, self.start, self.count = [], [], [], [], [], []
+        if len(boxes):
+            self.build(0, len(boxes))
+
+        self.lo = numpy.array(self.lo)
+        self.hi = numpy.array(self.hi)
+        self.sorted = boxes[self.order]     # boxes in leaf order (a leaf is a slice of them)
+
+        # plain float copies for the queries (a few float ops per box are much quicker than
+        # numpy calls on tiny arrays), and the boxes of each leaf as a list (None for inner nodes)
+        self.nodes = list(zip(self.lo.tolist(), self.hi.tolist()))
+        self.items = [(lo, hi) for lo, hi in boxes.tolist()]
+        self.runs = [self.order[start:start + count].tolist() if left < 0 else None
+                     for left, start, count in zip(self.left, self.start, self.count)]
+
+
+    # make the node for order[start:end], returns its index
+    def build(self, start, end):
+        items = self.order[start:end]
+        lo = self.boxes[items, 0].min(axis=0)
+        hi = self.boxes[items, 1].max(axis=0)
+
+        node = len(self.lo)
+        self.lo.append(lo)
+        self.hi.append(hi)
+        self.left.append(-1)
+        self.right.append(-1)
+        self.start.append(start)
+        self.count.append(end - start)
+
+        if end - start > self.leafsize:
+            centres = self.boxes[items].sum(axis=1)[:, numpy.argmax(hi - lo)]
+            self.order[start:end] = items[numpy.argsort(centres, kind="stable")]
+            middle = (start + end) // 2
+            self.left[node] = self.build(start, middle)
+            self.right[node] = self.build(middle, end)
+
+        return node
+
+
+    # nearest hit along the ray origin + t * direction (t >= 0), boxes grown by radius
+    # hit(start, end) checks what is in the boxes of a leaf the ray passes (order[start:end], or sorted, eg.
+    # tested all at once with numpy), returning None or a tuple starting with the t of the nearest (never
+    # less than where the ray enters its box), leaves are visited nearest entry first and the search stops
+    # once the next one starts beyond the best hit, returns that hit or None
+    def first(self, origin, direction, hit, radius=0.0):
+        if not self.nodes:
+            return None
+        if self.runs[0] is not None:    # a single leaf, nothing to skip
+            return hit(0, self.count[0])
+
+        origin = [float(o) for o in origin]
+        inverse = [1 / float(d) if d else None for d in direction]
+
+        # entry distance of the ray into a box, None if it misses (slab test)
+        def enter(lo, hi):
+            near, far = 0.0, float("inf")
+            for axis in range(3):
+                if inverse[axis] is None:   # parallel to this slab, has to start inside it
+                    if not lo[axis] - radius <= origin[axis] <= hi[axis] + radius:
+                        return None
+                    continue
+                t0 = (lo[axis] - radius - origin[axis]) * inverse[axis]
+                t1 = (hi[axis] + radius - origin[axis]) * inverse[axis]
+                near = max(near, min(t0, t1))
+                far = min(far, max(t0, t1))
+                if near > far:
+                    return None
+            return near
+
+        best = None
+        queue = []
+        if enter(*self.nodes[0]) is not None:
+            queue.append((enter(*self.nodes[0]), 0))
+
+        while queue:
+            t, node = heapq.heappop(queue)
+            if best is not None and t > best[0]:
+                break
+
+            if self.runs[node] is not None:
+                found = hit(self.start[node], self.start[node] + self.count[node])
+                if found is not None and (best is None or found[0] < best[0]):
+                    best = found
+            else:
+                for child in (self.left[node], self.right[node]):
+                    t = enter(*self.nodes[child])
+                    if t is not None:
+                        heapq.heappush(queue, (t, child))
+
+        return best
+
+
+    # box item with the smallest distance(item) to point, nodes further away than the best
+    # so far are skipped (distance to a box never exceeds distance to what is inside it)
+    # returns (distance, box index)
+    def nearest(self, point, distance):
+        point = [float(p) for p in point]
+
+        def boxDistance(lo, hi):
+            gaps = [max(lo[axis] - point[axis], point[axis] - hi[axis], 0.0) for axis in range(3)]
+            return math.sqrt(gaps[0] * gaps[0] + gaps[1] * gaps[1] + gaps[2] * gaps[2])
+
+        best = (math.inf, -1)
+        stack = [(0.0, 0)] if self.nodes else []
+        while stack:
+            d, node = stack.pop()
+            if d >= best[0]:
+                continue
+            if self.runs[node] is not None:
+                for item in self.runs[node]:
+                    if boxDistance(*self.items[item]) < best[0]:
+                        best = min(best, (distance(item), item))
+            else:
+                # nearer child searched first (pushed last)
+                near, far = sorted((boxDistance(*self.nodes[child]), child) for child in (self.left[node], self.right[node]))
+                stack.append(far)
+                stack.append(near)
+
+        return best
+
+
+# the six planes (a, b, c, d) of the view frustum of a (row major) projection * view matrix
+# a point is inside when a x + b y + c z + d >= 0 for every plane
+def frustumPlanes(matrix):
+    m = numpy.asarray(matrix, dtype=numpy.float64)
+    return numpy.array([m[3] + m[0], m[3] - m[0], m[3] + m[1], m[3] - m[1], m[3] + m[2], m[3] - m[2]])
+
+
+# which of the (n, 2, 3) boxes are at least partly inside the frustum planes (all boxes at once)
+# a box is outside when its corner furthest along a planes normal is still behind that plane,
+# ie. its centre is further behind the plane than the box reaches (half size . |normal|)
+def inFrustum(boxes, planes):
+    centres = (boxes[:, 0] + boxes[:, 1]) / 2
+    halves = (boxes[:, 1] - boxes[:, 0]) / 2
+    return (centres @ planes[:, :3].T + halves @ numpy.abs(planes[:, :3]).T + planes[:, 3] >= 0).all(axis=1)
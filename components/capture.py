@@ -0,0 +1,135 @@
+import os
+import queue
+import struct
+import threading
+import zlib
+import ctypes
+import numpy
+from OpenGL.GL import *
+
+# in process frame capture, a region of the framebuffer is read into a ring of pixel buffer
+# objects (the copy happens on the gpu, glReadPixels returns straight away) and each pbo is
+# only mapped a few frames later when its copy has finished, so capture never stalls the frame
+# frames are then encoded and written by a separate thread (png sequence or animated gif)
+
+
+# encode an (height, width, 3) rgb byte array as a png file
+def pngBytes(pixels):
+    height, width = pixels.shape[:2]
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    # every row starts with filter type 0 (none)
+    rows = numpy.zeros((height, width * 3 + 1), dtype=numpy.uint8)
+    rows[:, 1:] = pixels.reshape(height, -1)
+
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(rows.tobytes(), 3))
+            + chunk(b"IEND", b""))
+
+
+# thread writing captured frames, to out as numbered .png files or an animated .gif file (needs Pillow)
+class FrameWriter(threading.Thread):
+
+    def __init__(self, out, fps, fmt="png"):
+        super().__init__(daemon=True)
+        self.out = out
+        self.fps = fps
+        self.fmt = fmt
+        self.frames = queue.Queue(maxsize=64)   # blocks capture if encoding falls too far behind
+        self.written = 0
+
+        if fmt == "gif":
+            try:
+                from PIL import Image    # optional, only needed for gif
+            except ImportError:
+                raise RuntimeError("gif capture needs Pillow (pip install Pillow), or capture png frames") from None
+            self.images = []
+        else:
+            os.makedirs(out, exist_ok=True)
+
+        self.start()
+
+    # queue a frame (rgba rows bottom first, as read from gl)
+    def put(self, pixels):
+        self.frames.put(pixels)
+
+    def run(self):
+        while True:
+            pixels = self.frames.get()
+            if pixels is None:
+                break
+
+            rgb = pixels[::-1, :, :3]   # top row first, no alpha
+            if self.fmt == "gif":
+                from PIL import Image
+                self.images.append(Image.fromarray(numpy.ascontiguousarray(rgb)).convert("P", palette=Image.ADAPTIVE))
+            else:
+                with open(os.path.join(self.out, f"frame_{self.written:05d}.png"), "wb") as f:
+                    f.write(pngBytes(rgb))
+            self.written += 1
+
+        if self.fmt == "gif" and self.images:
+            self.images[0].save(self.out, save_all=True, append_images=self.images[1:],
+                                duration=round(1000 / self.fps), loop=0)
+
+    # write the remaining frames and wait for the thread
+    def finish(self):
+        self.frames.put(None)
+        self.join()
+
+
+# reads back the (x, y, width, height) region each frame through depth pbos
+class FrameCapture():
+
+    def __init__(self, x, y, width, height, out, fps, fmt="png", depth=3):
+        self.region = (x, y, width, height)
+        self.size = width * height * 4
+        self.shape = (height, width, 4)
+
+        self.writer = FrameWriter(out, fps, fmt)
+
+        self.pbos = glGenBuffers(depth)
+        for pbo in self.pbos:
+            glBindBuffer(GL_PIXEL_PACK_BUFFER, pbo)
+            glBufferData(GL_PIXEL_PACK_BUFFER, self.size, None, GL_STREAM_READ)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+
+        self.frame = 0  # frames read so far (the next pbo to use is frame % depth)
+
+
+    # start reading the current framebuffer into the next pbo, after handing on the frame
+    # that pbo held from depth frames ago
+    def capture(self):
+        pbo = self.pbos[self.frame % len(self.pbos)]
+        if self.frame >= len(self.pbos):
+            self.collect(pbo)
+
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, pbo)
+        glReadPixels(*self.region, GL_RGBA, GL_UNSIGNED_BYTE, ctypes.c_void_p(0))
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        self.frame += 1
+
+
+    # copy a finished pbo out and give it to the writer
+    def collect(self, pbo):
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, pbo)
+        address = glMapBufferRange(GL_PIXEL_PACK_BUFFER, 0, self.size, GL_MAP_READ_BIT)
+        pixels = numpy.frombuffer((ctypes.c_ubyte * self.size).from_address(address), dtype=numpy.uint8)
+        self.writer.put(pixels.reshape(self.shape).copy())
+        glUnmapBuffer(GL_PIXEL_PACK_BUFFER)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+
+
+    # collect the frames still in flight, finish writing and delete the pbos
+    # returns the number of frames written
+    def finish(self):
+        depth = len(self.pbos)
+        for frame in range(max(0, self.frame - depth), self.frame):
+            self.collect(self.pbos[frame % depth])
+
+        self.writer.finish()
+        glDeleteBuffers(depth, self.pbos)
+        return self.writer.written
@@ -0,0 +1,109 @@
+import numpy
+from OpenGL.GL import *
+
+from components.buffer import GrowableBuffer
+from components.quant import quantization
+
+# many paths drawn together, every paths curve, points and controls are packed into three
+# shared buffers with a table of where each paths curve starts and how many vertices it has
+# so all the curves draw with one glMultiDrawArrays (and points/controls one glDrawArrays each)
+# instead of binding and drawing every path on its own
+class PathCollection():
+
+    # compact curves are stored as int16 positions in the cube random paths are made in (+-extent)
+    extent = 5.0
+
+    # most curve vertices the ui makes a collection with (240 MiB of floats, see Scene.newCollection)
+    maxVertices = 20000000
+
+    def __init__(self, compact=False):
+        self.pathvao, self.pointsvao, self.controlsvao = glGenVertexArrays(3)
+        self.pathvbo, self.pointsvbo, self.controlsvbo = glGenBuffers(3)
+        self.released = False
+
+        # (offset, scale) of compact curves, None for floats
+        self.compact = compact
+        self.quant = quantization([-PathCollection.extent] * 3, [PathCollection.extent] * 3) if compact else None
+
+        self.curvebuf = GrowableBuffer(self.pathvao, self.pathvbo, cpu=False)
+        self.curvebuf.reset(cpu=False, quant=self.quant)
+        self.pointsbuf = GrowableBuffer(self.pointsvao, self.pointsvbo, cpu=False)
+        self.controlsbuf = GrowableBuffer(self.controlsvao, self.controlsvbo, cpu=False)
+
+        # first curve vertex and vertex count of each path (int32, as glMultiDrawArrays takes them)
+        self.first = numpy.empty(0, dtype=numpy.int32)
+        self.counts = numpy.empty(0, dtype=numpy.int32)
+
+
+    # number of paths
+    def __len__(self):
+        return len(self.counts)
+
+
+    # add a PathData (cpu evaluated curve, gpu curves are evaluated per path in the shader)
+    def add(self, data):
+        if data.gpu:
+            raise ValueError("gpu curve paths can't be added to a collection")
+        self.addBatch(data.points[None], data.controls[None], data.curve[None])
+
+
+    # add many paths of the same size at once, (paths, arcs + 1, 3) points, (paths, arcs, 3) controls
+    # and (paths, vertices, 3) curves (eg. from batch.generateChunk), one upload per buffer
+    # a compact collection takes int16 curves packed with its quant as they are (batch.generateChunk with
+    # quant, off the gl thread), float curves are packed here
+    def addBatch(self, points, controls, curve):
+        count, vertices = curve.shape[:2]
+        if curve.dtype == numpy.int16:
+            if not self.compact:
+                raise ValueError("packed curves can only be added to a compact collection")
+        elif self.compact and numpy.abs(curve).max(initial=0) > PathCollection.extent:
+            raise ValueError(f"paths outside +-{PathCollection.extent} can't be added to a compact collection")
+
+        first = self.curvebuf.vertices() + numpy.arange(count, dtype=numpy.int32) * vertices
+        self.first = numpy.concatenate((self.first, first.astype(numpy.int32)))
+        self.counts = numpy.concatenate((self.counts, numpy.full(count, vertices, dtype=numpy.int32)))
+
+        self.curvebuf.append(curve)
+        self.pointsbuf.append(points)
+        self.controlsbuf.append(controls)
+
+
+    # make room for count more paths of arcs (of degree) with vertices curve vertices each, so adding
+    # them a chunk at a time never grows (copies) the buffers on the way
+    def reserve(self, count, arcs, vertices, degree=2):
+        self.curvebuf.reserve(self.curvebuf.count + count * vertices * 3)
+        self.pointsbuf.reserve(self.pointsbuf.count + count * (arcs + 1) * 3)
+        self.controlsbuf.reserve(self.controlsbuf.count + count * arcs * (degree - 1) * 3)
+
+
+    # remove every path (buffers kept for the next ones)
+    def clear(self):
+        self.curvebuf.reset(cpu=False, quant=self.quant)
+        self.pointsbuf.reset(cpu=False)
+        self.controlsbuf.reset(cpu=False)
+        self.first = self.first[:0]
+        self.counts = self.counts[:0]
+
+
+    # draw every paths curve as its own line strip, in one call (path vao must be bound)
+    def drawCurves(self):
+        if len(self):
+            glMultiDrawArrays(GL_LINE_STRIP, self.first, self.counts, len(self))
+
+    def pointVertices(self):
+        return self.pointsbuf.vertices()
+
+    def controlVertices(self):
+        return self.controlsbuf.vertices()
+
+
+    # delete buffer data and vaos (collection can't be used after)
+    def release(self):
+        if self.released:
+            return
+        glDeleteVertexArrays(3, (self.pathvao, self.pointsvao, self.controlsvao))
+        glDeleteBuffers(3, (self.pathvbo, self.pointsvbo, self.controlsvbo))
+        self.released = True
+
+    def __del__(self):
+        self.release()
@@ -0,0 +1,240 @@
+import asyncio
+import errno
+import os
+import socket
+import struct
+import tempfile
+import threading
+import numpy
+
+# live feed of arcs from another process (eg. a simulation sending waypoints) over a local socket
+# every frame is a header (magic, degree, arcs) then little endian float32 xyz, the arcs endpoints
+# followed by their controls (degree - 1 per arc), each frame carries on from the end of the last one
+HEADER = struct.Struct("<2sBI")
+MAGIC = b"RB"
+MAXDEGREE = 8
+MAXARCS = 65536     # most arcs in one frame
+
+# unix socket in the temp directory, or a localhost port where there are no unix sockets ("host:port")
+ADDRESS = os.path.join(tempfile.gettempdir(), "random-bezier.sock") if hasattr(socket, "AF_UNIX") else "127.0.0.1:47800"
+
+
+# (host, port) of a localhost address, None for a unix socket path
+def tcp(address):
+    if ":" in address and not os.path.isabs(address):
+        host, port = address.rsplit(":", 1)
+        return host, int(port)
+    return None
+
+
+# true if nothing is listening on the unix socket file at address (connecting is refused)
+def stale(address):
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(address)
+    except ConnectionRefusedError:
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+    return False
+
+
+# (device, inode) of the file at path, None if there isn't one
+def identity(path):
+    try:
+        info = os.stat(path)
+    except OSError:
+        return None
+    return info.st_dev, info.st_ino
+
+
+# one frame of arcs, points (arcs, 3) and controls (arcs * (degree - 1), 3)
+def frame(points, controls, degree=2):
+    points = numpy.ascontiguousarray(points, dtype="<f4")
+    controls = numpy.ascontiguousarray(controls, dtype="<f4")
+    return HEADER.pack(MAGIC, degree, len(points)) + points.tobytes() + controls.tobytes()
+
+
+# connect to a listening feed, (reader, writer) asyncio streams
+async def connect(address=ADDRESS):
+    if tcp(address) is not None:
+        return await asyncio.open_connection(*tcp(address))
+    return await asyncio.open_unix_connection(address)
+
+
+# listens for feeds on address, an asyncio loop on its own thread reads the frames into a queue
+# of at most maxarcs arcs, the gl thread drains it once a frame (drain never waits on the network)
+# when the queue is full the connections aren't read until it is drained, so a producer sending
+# faster than the scene takes arcs is held back by its socket rather than growing the queue
+class PathFeed():
+
+    def __init__(self, address=ADDRESS, maxarcs=4096):
+        self.address = address
+        self.maxarcs = maxarcs
+        self.lock = threading.Lock()
+        self.queue = []     # (degree, points, controls) frames not drained yet
+        self.queued = 0     # arcs in the queue
+        self.received = 0   # arcs in total, and arcs dropped (another degree than the path)
+        self.dropped = 0
+        self.notify = None  # called (on the feed thread) when arcs arrive
+
+        self.loop = asyncio.new_event_loop()
+        self.space = None   # set when the queue has been drained (asyncio.Event of the loop)
+        self.server = None
+        self.writers = set()    # open connections
+        self.closing = False
+        self.bound = None       # (device, inode) of the unix socket file this feed made
+        started = threading.Event()
+        self.error = None
+
+        self.thread = threading.Thread(target=self.run, args=(started,), daemon=True)
+        self.thread.start()
+        started.wait()
+        if self.error is not None:
+            raise self.error
+
+
+    # feed thread, serves connections until closed
+    def run(self, started):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.space = asyncio.Event()
+            self.server = self.loop.run_until_complete(self.listen())
+        except OSError as error:
+            self.error = error
+            started.set()
+            self.loop.close()
+            return
+
+        started.set()
+        self.loop.run_forever()
+
+        # closed, stop listening and end the connections still open (their reads fail, or stop waiting for room)
+        self.closing = True
+        self.server.close()
+        for writer in self.writers:
+            writer.close()
+        self.space.set()
+        self.loop.run_until_complete(asyncio.gather(*asyncio.all_tasks(self.loop), return_exceptions=True))
+        self.loop.close()
+
+
+    async def listen(self):
+        if tcp(self.address) is not None:
+            return await asyncio.start_server(self.client, *tcp(self.address))
+
+        # a socket file left by a feed that wasn't closed refuses connections and is replaced,
+        # one that a running feed is listening on is left to it
+        if os.path.exists(self.address):
+            if not stale(self.address):
+                raise OSError(errno.EADDRINUSE, os.strerror(errno.EADDRINUSE), self.address)
+            os.remove(self.address)
+        server = await asyncio.start_unix_server(self.client, self.address)
+        self.bound = identity(self.address)
+        return server
+
+
+    # reads one connections frames until it closes (or sends something that isn't a frame)
+    async def client(self, reader, writer):
+        self.writers.add(writer)
+        try:
+            while True:
+                magic, degree, arcs = HEADER.unpack(await reader.readexactly(HEADER.size))
+                if magic != MAGIC or not 2 <= degree <= MAXDEGREE or arcs > MAXARCS:
+                    break
+
+                data = await reader.readexactly(arcs * degree * 12)
+                verts = numpy.frombuffer(data, dtype="<f4").reshape(-1, 3)
+
+                # wait for the gl thread to drain the queue if there's no room
+                while not self.closing:
+                    self.space.clear()
+                    if self.offer(degree, verts[:arcs], verts[arcs:]):
+                        break
+                    await self.space.wait()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.writers.discard(writer)
+            writer.close()
+
+
+    # queue a frame if it fits (a frame bigger than maxarcs fits an empty queue)
+    def offer(self, degree, points, controls):
+        with self.lock:
+            if self.queued and self.queued + len(points) > self.maxarcs:
+                return False
+            self.queue.append((degree, points, controls))
+            self.queued += len(points)
+            self.received += len(points)
+
+        if self.notify is not None:
+            self.notify()
+        return True
+
+
+    # true if there are arcs waiting to be drained
+    def pending(self):
+        with self.lock:
+            return self.queued > 0
+
+
+    # every arc that has arrived, as one (points, controls) of degree (arcs of other degrees are dropped)
+    # None if nothing has, never waits
+    def drain(self, degree):
+        with self.lock:
+            frames, self.queue, self.queued = self.queue, [], 0
+        if not frames:
+            return None
+        self.loop.call_soon_threadsafe(self.space.set)
+
+        kept = [(points, controls) for d, points, controls in frames if d == degree]
+        self.dropped += sum(len(points) for d, points, controls in frames if d != degree)
+        if not kept:
+            return None
+        return numpy.concatenate([p for p, c in kept]), numpy.concatenate([c for p, c in kept])
+
+
+    # stop listening and close every connection
+    def close(self):
+        if self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        # only the socket file this feed bound (another feed may have bound the address since)
+        if tcp(self.address) is None and self.bound is not None and identity(self.address) == self.bound:
+            os.remove(self.address)
+
+
+# stand-in producer, sends a random walk of waypoints as arcs (each endpoint a step on from the last,
+# controls around the middle) in frames of batch arcs, rate arcs per second (as fast as it can if None)
+# returns the arcs sent and seconds taken
+async def produce(address=ADDRESS, arcs=1000, batch=16, rate=None, degree=2, seed=None):
+    rng = numpy.random.default_rng(seed)
+    reader, writer = await connect(address)
+
+    last = numpy.zeros(3)
+    sent = 0
+    start = asyncio.get_running_loop().time()
+    while sent < arcs:
+        n = min(batch, arcs - sent)
+        steps = rng.normal(0, 1, (n, 3))
+        points = numpy.clip(last + numpy.cumsum(steps, axis=0), -5, 5)
+        starts = numpy.concatenate((last[None], points[:-1]))
+        controls = numpy.repeat((starts + points) / 2, degree - 1, axis=0) + rng.normal(0, 0.5, (n * (degree - 1), 3))
+        last = points[-1]
+
+        writer.write(frame(points, controls, degree))
+        await writer.drain()    # waits while the feeds socket is full (the scene is behind)
+        sent += n
+
+        if rate is not None:
+            ahead = start + sent / rate - asyncio.get_running_loop().time()
+            if ahead > 0:
+                await asyncio.sleep(ahead)
+
+    writer.close()
+    await writer.wait_closed()
+    return sent, asyncio.get_running_loop().time() - start
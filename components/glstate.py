@@ -0,0 +1,84 @@
+import collections
+import glm
+from OpenGL.GL import *
+
+# skips gl calls that would set state to what it already is (the bound program and vao, and
+# uniform values of each program), counting the calls made and the calls saved by kind
+# only knows about calls made through it, forget() after other code (eg. the ui renderer, or buffer
+# uploads that rebind vaos) has changed the bindings, uniforms are kept as they belong to a program
+class GLState():
+
+    def __init__(self):
+        self.program = None
+        self.vao = None
+        self.uniforms = {}  # (program, location): last value set
+
+        self.calls = collections.Counter()  # calls made / saved since resetCounts, by kind
+        self.saved = collections.Counter()
+
+
+    # bindings may have changed behind the cache, the next use/bind is always made
+    def forget(self):
+        self.program = None
+        self.vao = None
+
+
+    def resetCounts(self):
+        self.calls.clear()
+        self.saved.clear()
+
+
+    def useProgram(self, program):
+        if program == self.program:
+            self.saved["program"] += 1
+            return
+        glUseProgram(program)
+        self.program = program
+        self.calls["program"] += 1
+
+
+    def bindVertexArray(self, vao):
+        if vao == self.vao:
+            self.saved["vao"] += 1
+            return
+        glBindVertexArray(vao)
+        self.vao = vao
+        self.calls["vao"] += 1
+
+
+    # true if the uniform of the current program already holds value (recorded as set otherwise)
+    def same(self, location, value):
+        key = (self.program, location)
+        if self.uniforms.get(key) == value:
+            self.saved["uniform"] += 1
+            return True
+        self.uniforms[key] = value
+        self.calls["uniform"] += 1
+        return False
+
+
+    def uniform1i(self, location, value):
+        if not self.same(location, value):
+            glUniform1i(location, value)
+
+    def uniform1f(self, location, value):
+        value = float(value)
+        if not self.same(location, value):
+            glUniform1f(location, value)
+
+    # glm vec3 or any 3 floats
+    def uniform3f(self, location, value):
+        value = tuple(float(v) for v in value)
+        if not self.same(location, value):
+            glUniform3f(location, *value)
+
+    # glm vec4 or any 4 floats
+    def uniform4f(self, location, value):
+        value = tuple(value)
+        if not self.same(location, value):
+            glUniform4f(location, *value)
+
+    # glm mat4 (a copy is kept, the caller can change theirs)
+    def uniformMatrix4(self, location, matrix):
+        if not self.same(location, glm.mat4(matrix)):
+            glUniformMatrix4fv(location, 1, GL_FALSE, glm.value_ptr(matrix))
@@ -0,0 +1,108 @@
+import os
+
+# headless gl (no window or display), a software or gpu context through egl, or osmesa,
+# rendering into a framebuffer object
+# pyopengl picks its platform when OpenGL is first imported, so import this module first
+# (PYOPENGL_PLATFORM=osmesa for osmesa, egl by default)
+os.environ.setdefault("PYOPENGL_PLATFORM", "egl")
+os.environ.setdefault("EGL_PLATFORM", "surfaceless")    # mesa, no display server needed
+
+import ctypes
+import numpy
+from OpenGL.GL import *
+
+
+class OffscreenContext():
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+        self.platform = os.environ["PYOPENGL_PLATFORM"]
+        if self.platform == "osmesa":
+            self.createOSMesa()
+        else:
+            self.createEGL()
+
+        # framebuffer everything is drawn into (colour and depth)
+        self.fbo = glGenFramebuffers(1)
+        self.colour, self.depth = glGenRenderbuffers(2)
+
+        glBindRenderbuffer(GL_RENDERBUFFER, self.colour)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, width, height)
+        glBindRenderbuffer(GL_RENDERBUFFER, self.depth)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH_COMPONENT24, width, height)
+        glBindRenderbuffer(GL_RENDERBUFFER, 0)
+
+        glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, self.colour)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_RENDERBUFFER, self.depth)
+        if glCheckFramebufferStatus(GL_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError("offscreen framebuffer incomplete")
+
+        glViewport(0, 0, width, height)
+
+
+    # gl 3.3 core context with no surface (egl, mesa llvmpipe or a gpu driver)
+    def createEGL(self):
+        from OpenGL import EGL
+
+        self.display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        major, minor = EGL.EGLint(), EGL.EGLint()
+        if not EGL.eglInitialize(self.display, ctypes.pointer(major), ctypes.pointer(minor)):
+            raise RuntimeError("egl initialise failed")
+
+        config = EGL.EGLConfig()
+        count = EGL.EGLint()
+        attribs = (EGL.EGLint * 5)(EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+                                   EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT, EGL.EGL_NONE)
+        EGL.eglChooseConfig(self.display, attribs, ctypes.pointer(config), 1, ctypes.pointer(count))
+        if not count.value:
+            raise RuntimeError("no egl config for desktop gl")
+
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        attribs = (EGL.EGLint * 7)(EGL.EGL_CONTEXT_MAJOR_VERSION, 3, EGL.EGL_CONTEXT_MINOR_VERSION, 3,
+                                   EGL.EGL_CONTEXT_OPENGL_PROFILE_MASK, EGL.EGL_CONTEXT_OPENGL_CORE_PROFILE_BIT,
+                                   EGL.EGL_NONE)
+        self.context = EGL.eglCreateContext(self.display, config, EGL.EGL_NO_CONTEXT, attribs)
+        EGL.eglMakeCurrent(self.display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, self.context)
+
+
+    # osmesa software context (needs a buffer to be current, drawing still goes to the fbo)
+    def createOSMesa(self):
+        from OpenGL import osmesa
+
+        attribs = (ctypes.c_int * 9)(osmesa.OSMESA_FORMAT, osmesa.OSMESA_RGBA,
+                                     osmesa.OSMESA_PROFILE, osmesa.OSMESA_CORE_PROFILE,
+                                     osmesa.OSMESA_CONTEXT_MAJOR_VERSION, 3,
+                                     osmesa.OSMESA_CONTEXT_MINOR_VERSION, 3, 0)
+        self.context = osmesa.OSMesaCreateContextAttribs(attribs, None)
+        self.buffer = numpy.zeros((self.height, self.width, 4), dtype=numpy.uint8)
+        osmesa.OSMesaMakeCurrent(self.context, self.buffer, GL_UNSIGNED_BYTE, self.width, self.height)
+
+
+    # name of the gl renderer (eg. llvmpipe)
+    def renderer(self):
+        return glGetString(GL_RENDERER).decode()
+
+
+    # pixels of the framebuffer, (height, width, 4) rgba bytes with the first row at the top
+    def read(self):
+        glBindFramebuffer(GL_READ_FRAMEBUFFER, self.fbo)
+        pixels = glReadPixels(0, 0, self.width, self.height, GL_RGBA, GL_UNSIGNED_BYTE)
+        return numpy.frombuffer(pixels, dtype=numpy.uint8).reshape(self.height, self.width, 4)[::-1]
+
+
+    # delete the framebuffer and context
+    def release(self):
+        glDeleteFramebuffers(1, (self.fbo,))
+        glDeleteRenderbuffers(2, (self.colour, self.depth))
+
+        if self.platform == "osmesa":
+            from OpenGL import osmesa
+            osmesa.OSMesaDestroyContext(self.context)
+        else:
+            from OpenGL import EGL
+            EGL.eglMakeCurrent(self.display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+            EGL.eglDestroyContext(self.display, self.context)
+            EGL.eglTerminate(self.display)
@@ -1,7 +1,13 @@
-import glm
+import math
 import numpy
 from OpenGL.GL import *
 
+from components import bezier
+from components import bvh
+from components.buffer import GrowableBuffer, GrowableArray
+from components.quant import quantization
+from components.pathdata import PathData
+
 # path contains data for the curves/arcs/points/controls/settings
 class Path():
 
@@ -11,125 +17,471 @@ class Path():
     # number of arcs to generate 
     arcs = 8    # eg. 2 points per arc (total of (8 * 80) vertices the path traces out)
 
-    def __init__(self):
-        # points holds endpoints of arcs
-        self.points = []
-        self.points.extend([0, 0, 0])   # always start at origin
+    # degree of the arcs generated (2 quadratic, 3 cubic ... up to maxdegree, degree - 1 controls per arc)
+    degree = 2
+    maxdegree = 8   # most the path shader evaluates (gpu curve)
 
-        # generate a point to go to from origin
-        self.points.extend(numpy.random.uniform(low=-5, high=5, size=3))
+    # seed of the next generated path, None for a new random seed every time (the same seed
+    # and settings always make the same path, eg. to compare degrees or segments on one path)
+    nextSeed = None
 
-        self.controls = []  # holds all the control points
+    # evaluate the curve in the path vertex shader from points/controls only
+    # (no segment vertices computed or uploaded, segments can change without a new path)
+    gpuCurve = False
 
-        # generate one initial control point for the origin and second point
-        self.controls.extend(numpy.random.uniform(low=-5, high=5, size=3))
+    # adaptive segments, each arc gets as many segments as it needs to stay within
+    # tolerance of the true curve (up to PathData.maxsegments) rather than arcsegments
+    adaptive = False
+    tolerance = 0.005
 
-        # curve holds all arcs 
-        self.curve = []
+    # segments of the curve in each box the nearest arc search looks through, and points in each leaf
+    # of the picking bvh (tested together, a path with fewer is one leaf, a scan of all of them)
+    nearestPiece = 8
+    pickLeaf = 1024
 
+    # keep a cpu copy of the vertex data after upload (points/curve/data() read back from the gpu without it)
+    keepCpu = True
 
-        # generate a smooth path of a number of segments between the arcs endpoints
-        # (quadratic bezier part)
-        for i in range(0, Path.arcsegments):
-            # parameter t increasing along path
-            t = (i)/(Path.arcsegments-1)
+    # store the curve (and its levels of detail) as int16 positions in the paths box, half the memory
+    # and upload of floats (packed when generated, on the worker), at most half a step (box size / 65534)
+    # off per axis, drawn scaled back by the shader (cpu curves only, points/controls stay floats as the
+    # gpu curve reads them)
+    compact = False
 
-            # store start/end and control point
-            p0 = [self.points[0], self.points[1], self.points[2]]   # start
-            p1 = [self.controls[0], self.controls[1], self.controls[2]] # control
-            p2 = [self.points[3], self.points[4], self.points[5]]   # end
+    __slots__ = ("pathvao", "pointsvao", "controlsvao", "pathvbo", "pointsvbo", "controlsvbo", "released",
+                 "curvebuf", "pointsbuf", "controlsbuf", "pointstex", "controlstex",
+                 "gpu", "segments", "tol", "offsets", "last", "arcdata", "lengths", "bounds", "tree", "pieces",
+                 "lodvao", "lodvbo", "lodbuf", "lodOffsets", "lodEnds", "lodChunks", "lodBuilt", "bend", "quant", "deg", "seed", "morphvbo", "morphing", "tables")
 
-            # bezier point 1 calculation
-            l0 = [ ((1-t)*p0[0]) + (t*p1[0]),
-                   ((1-t)*p0[1]) + (t*p1[1]),
-                   ((1-t)*p0[2]) + (t*p1[2]) ]
+    # gpu side of a path (buffers/vaos), uploads a PathData
+    # data is an already generated path, otherwise a new random one is made
+    def __init__(self, data=None):
+        # generate vaos/vbos for path objects, made once and reused by every regenerated path
+        self.pathvao, self.pointsvao, self.controlsvao = glGenVertexArrays(3)
+        self.pathvbo, self.pointsvbo, self.controlsvbo = glGenBuffers(3)
+        self.released = False
 
-            # bezier point 2 calculation
-            l1 = [ ((1-t)*p1[0]) + (t*p2[0]),
-                   ((1-t)*p1[1]) + (t*p2[1]),
-                   ((1-t)*p1[2]) + (t*p2[2]) ]
+        # growable buffers (and vaos for them) holding all path data
+        self.curvebuf = GrowableBuffer(self.pathvao, self.pathvbo)
+        self.pointsbuf = GrowableBuffer(self.pointsvao, self.pointsvbo)
+        self.controlsbuf = GrowableBuffer(self.controlsvao, self.controlsvbo)
 
-            # calc the final segment vertex position that traces a bezier curve for this 't'
-            vert = [ ((1-t)*l0[0]) + (t*l1[0]),
-                     ((1-t)*l0[1]) + (t*l1[1]),
-                     ((1-t)*l0[2]) + (t*l1[2]) ]
+        # per arc (and per vertex lengths) tables, grown as arcs are appended (only the new rows written),
+        # offsets/lengths/arcdata/bounds/bend are views of their rows in use (see setTables)
+        self.tables = {name: GrowableArray() for name in ("offsets", "lengths", "arcdata", "bounds", "bend")}
 
-            # add this bezier position to the curve
-            self.curve.extend(vert)
+        # coarser levels of detail of the curve (every level in one buffer, gpu only), made when first drawn
+        # and extended with the arcs appended since (see buildLevels)
+        self.lodvao = glGenVertexArrays(1)
+        self.lodvbo = glGenBuffers(1)
+        self.lodbuf = GrowableBuffer(self.lodvao, self.lodvbo, cpu=False)
 
-        # extend this path after initial arc to number of arcs
-        for i in range(1, Path.arcs):
-            self.addArc()   # same process
+        # positions the curve morphs from (second attribute of the path vao while morphing)
+        self.morphvbo = glGenBuffers(1)
+        self.morphing = False
 
-        # send stored lists of vertex positions for the arc endpoints, controls and segments
-        # into arrays of float32s before use with opengl
-        self.gcurve = glm.array(glm.float32, *self.curve)
-        self.gpoints = glm.array(glm.float32, *self.points)
-        self.gcontrols = glm.array(glm.float32, *self.controls)
-        
-        # generate vaos/vbos for path objects 
-        self.pathvao, self.pointsvao, self.controlsvao = glGenVertexArrays(3)
-        self.pathvbo, self.pointsvbo, self.controlsvbo = glGenBuffers(3)
+        # points/controls buffers also read as texture buffers by the path shader (gpu curve)
+        self.pointstex, self.controlstex = glGenTextures(2)
+        self.bufferTexture(self.pointstex, self.pointsvbo)
+        self.bufferTexture(self.controlstex, self.controlsvbo)
+
+        if data is None:
+            self.regenerate()
+        else:
+            self.upload(data)
+
+    # current path settings, the (keyword) arguments of PathData.generate
+    @staticmethod
+    def settings():
+        return dict(arcs=Path.arcs, segments=Path.arcsegments, gpu=Path.gpuCurve,
+                    tolerance=Path.tolerance if Path.adaptive else None, degree=Path.degree, seed=Path.nextSeed,
+                    compact=Path.compact)
+
+    # generate a new random path into the existing buffers (no new gl objects)
+    def regenerate(self):
+        self.upload(PathData.generate(**Path.settings()))
+
+    # replace the path with generated data (on the gl context thread)
+    def upload(self, data):
+        self.endMorph()
+
+        # settings of this path (appended arcs match) and vertex offset of each arc
+        # (tol is the paths tolerance, None with fixed segments)
+        self.gpu = data.gpu
+        self.segments = data.segments
+        self.tol = data.tolerance
+        self.deg = data.degree     # degree of the arcs (Path.degree is the setting for new paths)
+        self.seed = data.seed      # seed it was generated from, None once arcs are appended
+        self.last = numpy.array(data.points[-1])    # end of the path, appended arcs start here
+
+        # tables made with the data (PathData.measure, on the worker for generated paths), only copied here
+        # [start, controls..., end] of every arc and the distance along the path to every curve vertex
+        # (traced at constant speed by looking the distance up in lengths)
+        # box around each arc (culling) and a bvh of them for picking, built when first picked
+        # how much each arc bends (see bezier.bend, sets the segments it needs on screen), levels of detail
+        # are made again when next drawn
+        # (copies, data may be a mapped file)
+        data.measure()
+        self.setTables(offsets=data.offsets, lengths=data.lengths, arcdata=data.arcdata, bounds=data.bounds, bend=data.bend)
+        self.tree = None
+        self.pieces = None
+        self.lodOffsets = None
+
+        # (offset, scale) of the compact curve in the box of the arcs, None for floats, packed with the data
+        # (PathData.pack, generated with Path.compact) so the int16 curve is uploaded as it is
+        self.quant = data.quant if data.packed is not None else None
+
+        # replace the buffers contents (old storage orphaned, grown only if too small)
+        self.curvebuf.reset(data.curve if self.quant is None else data.packed, cpu=Path.keepCpu, quant=self.quant)
+        self.pointsbuf.reset(data.points, cpu=Path.keepCpu)
+        self.controlsbuf.reset(data.controls, cpu=Path.keepCpu)
+
+        # no curve vertices to read when the shader evaluates it
+        glBindVertexArray(self.pathvao)
+        if self.gpu:
+            glDisableVertexAttribArray(0)
+        else:
+            glEnableVertexAttribArray(0)
+        glBindVertexArray(0)
+
+    # the path as PathData (copies of the buffers data), eg. for saving
+    def data(self):
+        self.followSegments()
+        data = PathData(self.points.reshape(-1, 3).copy(), self.controls.reshape(-1, 3).copy(),
+                        self.curve.reshape(-1, 3).copy(), self.offsets.copy(), self.segments, self.tol, self.gpu,
+                        self.deg, self.seed)
+        data.lengths = self.lengths.copy()
+        return data
+
+    # flat float32 vertex data of the path (cpu copies of the buffers, or read back from the gpu)
+    @property
+    def curve(self):
+        return self.curvebuf.view()
+
+    @property
+    def points(self):
+        return self.pointsbuf.view()
+
+    @property
+    def controls(self):
+        return self.controlsbuf.view()
+
+    # number of vertices the curve is drawn with (gpu curve uses the current segments setting)
+    def curveVertices(self):
+        if self.gpu:
+            return (self.pointsbuf.vertices() - 1) * Path.arcsegments
+        return self.curvebuf.vertices()
+
+    def pointVertices(self):
+        return self.pointsbuf.vertices()
+
+    def controlVertices(self):
+        return self.controlsbuf.vertices()
+
+    # length of the whole path
+    def length(self):
+        self.followSegments()
+        return self.lengths[-1]
+
+    # gpu curves are drawn with the current segments setting, their segments, offsets and lengths follow
+    # it (remeasured when it changes) so traced vertices are counted the same way they are drawn
+    def followSegments(self):
+        if not self.gpu or self.segments == Path.arcsegments:
+            return
+        self.segments = Path.arcsegments
+        self.pieces = None
+        self.setTables(offsets=numpy.arange(len(self.offsets)) * self.segments,
+                       lengths=bezier.arcLengths(bezier.evaluate(self.arcdata, self.segments)))
+
+    # curve vertex reached after tracing distance along the path (binary search of the lengths, so
+    # the same cost however long the path is) and the partly traced segment on from it
+    # ((start, end) points, None when the trace is on a vertex or at the end)
+    def trace(self, distance):
+        self.followSegments()
+        i = max(int(numpy.searchsorted(self.lengths, distance, side="right")) - 1, 0)
+        if i + 1 >= len(self.lengths) or self.lengths[i + 1] == self.lengths[i]:
+            return min(i, len(self.lengths) - 1), None
+
+        f = (distance - self.lengths[i]) / (self.lengths[i + 1] - self.lengths[i])
+        arc = int(numpy.searchsorted(self.offsets, i, side="right")) - 1
+        count = int(self.offsets[arc + 1] - self.offsets[arc])
+        return i, bezier.partialSegment(self.arcdata[arc], i - int(self.offsets[arc]), count, f)
+
+    # first vertex of each arc (and the total) as drawn, gpu curves use the current segments setting
+    def arcOffsets(self):
+        self.followSegments()
+        return self.offsets
+
+    # vertex ranges that draw the first n vertices of the curve, [(vao, first, counts)] one multi draw each
+    # with viewproj (row major projection * view) only runs of arcs with boxes in view are drawn (unless cull
+    # is off), and with pixels as well every fully traced arc is drawn from the coarsest level of detail that
+    # stays within pixels of the true curve (on a screen height pixels tall)
+    def draws(self, n, viewproj=None, pixels=None, height=800, cull=True):
+        if viewproj is None or not cull and (pixels is None or self.gpu):
+            return [(self.pathvao, numpy.array([0], dtype=numpy.int32), numpy.array([n], dtype=numpy.int32))]
+
+        offsets = self.arcOffsets()
+        visible = offsets[:-1] < n
+        if cull:
+            visible &= bvh.inFrustum(self.bounds, bvh.frustumPlanes(viewproj))
+
+        # level of each arc (partly traced arcs always full detail), -1 for arcs not drawn
+        lod = pixels is not None and not self.gpu
+        level = numpy.zeros(len(visible), dtype=numpy.int64)
+        if lod:
+            level = numpy.where(offsets[1:] <= n, self.lodLevels(viewproj, pixels, height), 0)
+        level[~visible] = -1
+
+        # runs of consecutive arcs on the same level [start, end), each drawn as one strip
+        # (coarse runs are split where the lod buffer has a chunk of arcs added since the levels were built)
+        change = numpy.flatnonzero(numpy.diff(level)) + 1
+        if lod and len(self.lodChunks) > 1:
+            chunks = numpy.array(self.lodChunks[1:])
+            change = numpy.union1d(change, chunks[level[chunks] > 0])
+        starts = numpy.concatenate(([0], change))
+        ends = numpy.concatenate((change, [len(level)]))
+        levels = level[starts]
+
+        full = levels == 0
+        first = offsets[starts[full]]
+        last = numpy.minimum(offsets[ends[full]], n)
+        draws = [(self.pathvao, first.astype(numpy.int32), (last - first).astype(numpy.int32))]
+
+        coarse = levels > 0
+        if coarse.any():
+            first = self.lodOffsets.view()[starts[coarse], levels[coarse]]
+            last = self.lodEnds.view()[ends[coarse] - 1, levels[coarse]]
+            draws.append((self.lodvao, first.astype(numpy.int32), (last - first).astype(numpy.int32)))
+
+        return draws
 
+    # coarsest level each arc can be drawn at, the screen size of a unit at the arcs nearest
+    # (its box centre less its radius towards the camera) gives the segments it needs to stay within
+    # pixels (an arc with n segments is at most bend / 4n^2 off the curve, see bezier.adaptiveSegments)
+    # level l halves the arcs segments l times
+    def lodLevels(self, viewproj, pixels, height):
+        if self.lodOffsets is None or len(self.arcdata) > 2 * self.lodBuilt:
+            self.buildLevels()
+        elif self.lodOffsets.count < len(self.arcdata):
+            self.extendLevels()
 
-        # upload all path data to buffers and vao for them
-        self.bufferObject(self.pathvao, self.pathvbo, self.gcurve)
-        self.bufferObject(self.pointsvao, self.pointsvbo, self.gpoints)
-        self.bufferObject(self.controlsvao, self.controlsvbo, self.gcontrols)
+        viewproj = numpy.asarray(viewproj, dtype=numpy.float64)
+        centres = (self.bounds[:, 0] + self.bounds[:, 1]) / 2
+        radius = numpy.linalg.norm(self.bounds[:, 1] - self.bounds[:, 0], axis=1) / 2
+
+        # clip w is the view depth, a move d of a point moves it on screen by (row x/y . d - screen x/y * row w . d) / w
+        # (rows of the matrix), at most (|row x/y| + |row w|) |d| / w for points in view (screen x/y within -1 to 1)
+        rows = numpy.linalg.norm(viewproj[:, :3], axis=1)
+        depth = centres @ viewproj[3, :3] + viewproj[3, 3] - rows[3] * radius
+        perunit = height / 2 * (max(rows[0], rows[1]) + rows[3]) / numpy.maximum(depth, 1e-6)
+
+        needed = numpy.maximum(numpy.ceil(numpy.sqrt(self.bend * perunit / (4 * pixels))), 1)
+        lines = numpy.diff(self.offsets) - 1
+        with numpy.errstate(divide="ignore"):
+            level = numpy.floor(numpy.log2(lines / needed))
+        return numpy.clip(level, 0, self.lodOffsets.data.shape[1] - 1).astype(numpy.int64)
+
+    # evaluate every coarser level (halving the segments until arcs are single lines) into the lod buffer
+    # lodOffsets[arc, level] is the first vertex of an arc on that level and lodEnds[arc, level] one past its
+    # last (level 0 is the curve itself), grown as arcs are appended, each extension adds a chunk of the new
+    # arcs levels to the end of the buffer (lodChunks, first arc of each), so an append only evaluates its
+    # own arcs, built again from scratch once the path has doubled (keeps the chunks, and strips, few)
+    def buildLevels(self):
+        lines = numpy.diff(self.offsets) - 1
+        levels = int(numpy.ceil(numpy.log2(max(lines.max(), 1)))) + 1
+        self.lodbuf.reset(None, cpu=False, quant=self.quant)
+        self.lodOffsets = GrowableArray(numpy.empty((0, levels), dtype=numpy.int64))
+        self.lodEnds = GrowableArray(numpy.empty((0, levels), dtype=numpy.int64))
+        self.lodChunks = []
+        self.lodBuilt = len(lines)
+        self.extendLevels()
+
+    # levels of the arcs not in the lod buffer yet (an arc needing more levels than the path was built
+    # with stops at the coarsest, levels clip to it)
+    def extendLevels(self):
+        start = self.lodOffsets.count
+        lines = numpy.diff(self.offsets[start:]) - 1
+        firsts, lasts = [self.offsets[start:-1]], [self.offsets[start + 1:]]
+        verts = []
+        total = self.lodbuf.vertices()
+        for level in range(1, self.lodOffsets.data.shape[1]):
+            counts = numpy.ceil(lines / 2**level).astype(numpy.int64) + 1
+            v, offsets = bezier.evaluateCounts(self.arcdata[start:], counts)
+            firsts.append(offsets[:-1] + total)
+            lasts.append(offsets[1:] + total)
+            verts.append(v)
+            total += len(v)
+
+        if verts:
+            self.lodbuf.append(numpy.concatenate(verts))
+        self.lodOffsets.append(numpy.array(firsts).T)
+        self.lodEnds.append(numpy.array(lasts).T)
+        self.lodChunks.append(start)
+
+    # endpoint or control nearest along the ray (origin + t * direction) within radius of it
+    # returns ("point" or "control", index) or None, the bvh is over the endpoints and controls themselves
+    # (an arcs box covers much of the path, a point's box only what the ray passes within radius of),
+    # in leaves of pickLeaf points tested together
+    def pick(self, origin, direction, radius):
+        if self.tree is None:
+            spots = numpy.concatenate((self.arcdata[:, 0], self.arcdata[-1:, -1], self.arcdata[:, 1:-1].reshape(-1, 3)))
+            self.tree = bvh.BVH(numpy.stack((spots, spots), axis=1), leafsize=Path.pickLeaf)
+        spots = self.tree.sorted[:, 0]
+
+        length = math.sqrt(sum(float(d) ** 2 for d in direction))
+        origin = numpy.array(origin, dtype=numpy.float64)
+        direction = numpy.array(direction, dtype=numpy.float64) / length
+
+        # the nearest along the ray of the endpoints (the first arcs + 1) and controls of a leaf within radius of it
+        points = len(self.arcdata) + 1
+        def hit(start, end):
+            offsets = spots[start:end] - origin
+            along = offsets @ direction
+            miss = numpy.einsum("ij,ij->i", offsets, offsets) - along * along
+            near = numpy.flatnonzero((along >= 0) & (miss <= radius * radius))
+            if not len(near):
+                return None
+            nearest = near[numpy.argmin(along[near])]
+            item = int(self.tree.order[start + nearest])
+            return (float(along[nearest]),) + (("point", item) if item < points else ("control", item - points))
+
+        best = self.tree.first(origin, direction, hit, radius)
+        return None if best is None else best[1:]
+
+    # arc of the curve nearest to point and its distance (to the nearest curve vertex), the bvh is over
+    # pieces of the curve (nearestPiece segments of an arc each) boxed by their vertices
+    def nearest(self, point):
+        if self.pieces is None:
+            self.buildPieces()
+        curve, firsts, lasts, arcs, tree = self.pieces
+
+        point = numpy.asarray(point, dtype=numpy.float64)
+        def distance(piece):
+            return math.sqrt(((curve[firsts[piece]:lasts[piece] + 1] - point) ** 2).sum(axis=1).min())
+
+        d, piece = tree.nearest(point, distance)
+        return int(arcs[piece]), d
+
+    # (curve, first vertex, last vertex, arc, bvh) of the pieces of the curve, neighbouring pieces share a vertex
+    def buildPieces(self):
+        offsets = self.arcOffsets()
+        curve = bezier.evaluate(self.arcdata, self.segments) if self.gpu else self.curve.reshape(-1, 3)
+        curve = numpy.asarray(curve, dtype=numpy.float64)
+
+        lines = numpy.diff(offsets) - 1
+        per = numpy.maximum(numpy.ceil(lines / Path.nearestPiece), 1).astype(numpy.int64)
+        arcs = numpy.repeat(numpy.arange(len(lines)), per)
+        firsts = offsets[arcs] + (numpy.arange(len(arcs)) - numpy.repeat(numpy.cumsum(per) - per, per)) * Path.nearestPiece
+        lasts = numpy.minimum(firsts + Path.nearestPiece, offsets[arcs + 1] - 1)
+
+        # each runs up to the next piece (or the end), and takes in the vertex it shares with it
+        lo = numpy.minimum(numpy.minimum.reduceat(curve, firsts), curve[lasts])
+        hi = numpy.maximum(numpy.maximum.reduceat(curve, firsts), curve[lasts])
+        self.pieces = (curve, firsts.tolist(), lasts.tolist(), arcs, bvh.BVH(numpy.stack((lo, hi), axis=1), leafsize=16))
+
+    # extend the path by n random arcs, only the new arcs are calculated and uploaded
+    def append_arcs(self, n):
+        # new arcs continue on from the last endpoint of the path
+        self.followSegments()
+        self.append_data(PathData.generate(n, self.segments, self.gpu, self.tol, start=self.last, degree=self.deg))
+
+    # extend the path by given arcs (eg. from a feed), endpoints (n, 3) and controls (n * (degree - 1), 3)
+    # carrying on from the last endpoint, evaluated with the paths segments/tolerance
+    def append_points(self, points, controls):
+        self.followSegments()
+        points = numpy.concatenate((self.last[None], numpy.asarray(points, dtype=numpy.float32)))
+        self.append_data(PathData.fromArcs(points, controls, self.segments, self.gpu, self.tol, self.deg))
+
+    # extend the path by PathData starting at its last endpoint
+    def append_data(self, new):
+        self.endMorph()     # the new vertices have nothing to morph from
+        self.last = new.points[-1]
+        self.seed = None
+
+        # new arcs start at the last vertex, so their lengths (and offsets) carry on from the end
+        # (only the new rows are written to the tables)
+        new.measure()
+        self.appendTables(offsets=self.offsets[-1] + new.offsets[1:], lengths=new.lengths + self.length(),
+                          arcdata=new.arcdata, bounds=new.bounds, bend=new.bend)
+        self.tree = None
+        self.pieces = None
+
+        self.pointsbuf.append(new.points[1:])
+        self.controlsbuf.append(new.controls)
+
+        # a compact curve is stored again in a bigger box when the new arcs go outside its box
+        # (evaluated again rather than read back, so it stays within half a step of the curve)
+        if self.quant is not None:
+            lo, hi = self.bounds[:, 0].min(axis=0), self.bounds[:, 1].max(axis=0)
+            offset, scale = self.quant
+            if (numpy.abs(numpy.array((lo, hi)) - offset) > scale * 32767).any():
+                self.quant = quantization(lo, hi)
+                self.lodOffsets = None
+                curve, offsets = bezier.evaluateCounts(self.arcdata, numpy.diff(self.offsets))
+                self.curvebuf.reset(curve, cpu=self.curvebuf.cpu, quant=self.quant)
+                return
+
+        self.curvebuf.append(new.curve)
+
+    # replace tables with the given rows, or add rows to their ends (see tables)
+    def setTables(self, **rows):
+        for name, values in rows.items():
+            self.tables[name].reset(values)
+            setattr(self, name, self.tables[name].view())
+
+    def appendTables(self, **rows):
+        for name, values in rows.items():
+            self.tables[name].append(values)
+            setattr(self, name, self.tables[name].view())
 
     # adds an arc to the curve
     def addArc(self):
-        newpoint = numpy.random.uniform(low=-5, high=5, size=3) # new next random point
-        newcontrol = numpy.random.uniform(low=-4, high=4, size=3)   # a new random control
-        
-        # calculate a new arc based on the last arc endpoint and the new one and control from above 
-        newarc = self.calcNew([self.points[-3],self.points[-2], self.points[-1]],
-                               newcontrol, newpoint, segments=Path.arcsegments)
-        
-        # add this data to the curve
-        self.curve.extend(newarc)
-        self.points.extend(newpoint)
-        self.controls.extend(newcontrol)
-
-
-    # quadratic bezier method for the arc segments
-    @staticmethod
-    def calcNew(p0, p1, p2, segments):
-        segarcs = []
-        for i in range(0, segments):
-            t = (i)/(segments-1)
-            l0 = [ ((1-t)*p0[0]) + (t*p1[0]),
-                   ((1-t)*p0[1]) + (t*p1[1]),
-                   ((1-t)*p0[2]) + (t*p1[2]) ]
-            l1 = [ ((1-t)*p1[0]) + (t*p2[0]),
-                   ((1-t)*p1[1]) + (t*p2[1]),
-                   ((1-t)*p1[2]) + (t*p2[2]) ]
-            vert = [ ((1-t)*l0[0]) + (t*l1[0]),
-                     ((1-t)*l0[1]) + (t*l1[1]),
-                     ((1-t)*l0[2]) + (t*l1[2]) ]
-            segarcs.extend(vert)
-
-        return segarcs
-
-    # upload the vertex data of the path to buffers
-    @staticmethod
-    def bufferObject(vao, vbo, garray):
-        glBindVertexArray(vao)  # bind the given vao
-        
-        glBindBuffer(GL_ARRAY_BUFFER, vbo)  # bind given buffer
-        glBufferData(GL_ARRAY_BUFFER, glm.sizeof(garray), garray.ptr, GL_STATIC_DRAW)   # upload all data
-        
-        # vao attribute for position
-        glEnableVertexAttribArray(0)
-        glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(0))
-
-        # unbind all
+        self.append_arcs(1)
+
+
+    # morph to the curve from positions (one per curve vertex, eg. the last paths curve, see PathWorker.morphFrom)
+    # read by the shader as a second vertex attribute, mixed in by the morph uniform
+    def startMorph(self, positions):
+        positions = numpy.ascontiguousarray(positions, dtype=numpy.float32)
+        glBindBuffer(GL_ARRAY_BUFFER, self.morphvbo)
+        glBufferData(GL_ARRAY_BUFFER, positions.nbytes, positions, GL_STREAM_DRAW)
+        glBindVertexArray(self.pathvao)
+        glEnableVertexAttribArray(1)
+        glVertexAttribPointer(1, 3, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(0))
+        glBindVertexArray(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self.morphing = True
+
+    # stop reading the morph positions (and free them)
+    def endMorph(self):
+        if not self.morphing:
+            return
+        glBindVertexArray(self.pathvao)
+        glDisableVertexAttribArray(1)
         glBindVertexArray(0)
+        glBindBuffer(GL_ARRAY_BUFFER, self.morphvbo)
+        glBufferData(GL_ARRAY_BUFFER, 0, None, GL_STREAM_DRAW)
         glBindBuffer(GL_ARRAY_BUFFER, 0)
-        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        self.morphing = False
+
+
+    # view a buffer of floats as a texture buffer (single float texels, as
+    # three component float texture buffers need gl 4.0)
+    @staticmethod
+    def bufferTexture(tex, vbo):
+        glBindTexture(GL_TEXTURE_BUFFER, tex)
+        glTexBuffer(GL_TEXTURE_BUFFER, GL_R32F, vbo)
+        glBindTexture(GL_TEXTURE_BUFFER, 0)
+
 
+    # delete buffer data and vao (path can't be used after)
+    def release(self):
+        if self.released:
+            return
+        glDeleteTextures(2, (self.pointstex, self.controlstex))
+        glDeleteVertexArrays(4, (self.pathvao, self.pointsvao, self.controlsvao, self.lodvao))
+        glDeleteBuffers(5, (self.pathvbo, self.pointsvbo, self.controlsvbo, self.lodvbo, self.morphvbo))
+        self.released = True
 
-    # delete buffer data and vao
     def __del__(self):
-        glDeleteVertexArrays(3, (self.pathvao, self.pointsvao, self.controlsvao))
-        glDeleteBuffers(3, (self.pathvbo, self.pointsvbo, self.controlsvbo))
\ No newline at end of file
+        self.release()
\ No newline at end of file
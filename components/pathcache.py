@@ -0,0 +1,118 @@
+import collections
+import os
+import threading
+
+from components import pathfile
+from components.pathdata import PathData
+
+# recently generated paths kept by their seed and settings, so asking for one of them again (going back
+# to an earlier path, comparing settings on the same seed) takes no generating at all
+# least recently used paths are dropped past maxbytes, or written to spill (a directory) and memory
+# mapped back from there when asked for again, safe to use from the worker and gl threads
+class PathCache():
+
+    # where paths are spilled to when turned on (eg. PathCache(spill=PathCache.spillDir))
+    spillDir = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "random-bezier", "paths")
+
+    def __init__(self, maxbytes=256 * 2**20, spill=None):
+        self.maxbytes = maxbytes
+        self.spill = spill
+        self.lock = threading.Lock()
+        self.entries = collections.OrderedDict()    # key: PathData, least recently used first
+        self.bytes = 0
+
+        self.hits = collections.Counter()   # "memory", "disk" hits and "generated" misses
+
+
+    # what identifies a generated path (paths continuing from a start aren't cached)
+    @staticmethod
+    def key(arcs, segments, gpu=False, tolerance=None, degree=2, seed=None, compact=False):
+        return (seed, arcs, segments, degree, tolerance, gpu, compact)
+
+    @staticmethod
+    def size(data):
+        tables = sum(table.nbytes for table in (data.arcdata, data.lengths, data.bounds, data.bend, data.packed)
+                     if table is not None)
+        return data.points.nbytes + data.controls.nbytes + data.curve.nbytes + data.offsets.nbytes + tables
+
+
+    # same arguments as PathData.generate (without rng or start), a new seed is picked for seed=None
+    def generate(self, **settings):
+        if settings.get("seed") is None:
+            settings["seed"] = PathData.newSeed()
+        key = PathCache.key(**settings)
+
+        data = self.get(key)
+        if data is None:
+            data = PathData.generate(**settings)
+            self.put(key, data)
+            self.hits["generated"] += 1
+        return data
+
+
+    # cached path data, None if not in memory or spilled to disk
+    def get(self, key):
+        with self.lock:
+            data = self.entries.get(key)
+            if data is not None:
+                self.entries.move_to_end(key)
+                self.hits["memory"] += 1
+                return data
+
+        file = self.spillFile(key)
+        if file is None or not os.path.exists(file):
+            return None
+        try:
+            data = pathfile.load(file)
+        except (OSError, ValueError):
+            return None
+        data.seed = key[0]
+        data.measure()      # tables not in the file, made here rather than on the gl thread
+        if key[-1]:
+            data.pack()
+        self.hits["disk"] += 1
+        self.put(key, data)
+        return data
+
+
+    def put(self, key, data):
+        with self.lock:
+            if key in self.entries:
+                self.bytes -= PathCache.size(self.entries.pop(key))
+            self.entries[key] = data
+            self.bytes += PathCache.size(data)
+
+            evicted = []
+            while self.bytes > self.maxbytes and len(self.entries) > 1:
+                old, olddata = self.entries.popitem(last=False)
+                self.bytes -= PathCache.size(olddata)
+                evicted.append((old, olddata))
+
+        for old, olddata in evicted:
+            self.write(old, olddata)
+
+
+    # write an evicted path to the spill directory (failing to is fine, it's generated again)
+    def write(self, key, data):
+        file = self.spillFile(key)
+        if file is None or os.path.exists(file):
+            return
+        try:
+            os.makedirs(self.spill, exist_ok=True)
+            pathfile.save(file + ".tmp", data)
+            os.replace(file + ".tmp", file)     # never leaves a half written path
+        except OSError:
+            pass
+
+
+    def spillFile(self, key):
+        if self.spill is None:
+            return None
+        return os.path.join(self.spill, "_".join(str(part) for part in key) + ".rbz")
+
+
+    # forget every path in memory (spilled files are kept)
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
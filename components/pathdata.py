@@ -0,0 +1,174 @@
+import numpy
+
+from components import bezier
+from components.quant import quantization, quantize
+
+# path data model, generates and holds a path as numpy arrays (no opengl)
+# so paths can be made, saved and benchmarked without a window (see Path for the gpu side)
+class PathData():
+
+    # most segments an adaptive arc can have
+    maxsegments = 300
+
+    __slots__ = ("points", "controls", "curve", "offsets", "segments", "tolerance", "gpu", "degree", "seed",
+                 "arcdata", "lengths", "bounds", "bend", "quant", "packed")
+
+    # points (arcs + 1, 3) endpoints, controls (arcs * (degree - 1), 3), curve (vertices, 3) float32 arrays
+    # offsets (arcs + 1) is the curve vertex each arc starts at (last is the total)
+    # segments per arc, or tolerance for adaptive segments (None when fixed)
+    # gpu paths have no curve vertices, the shader evaluates them
+    # degree of every arc (2 quadratic, one control per arc, 3 cubic, two controls...)
+    # seed the path was generated from (None if not known, eg. loaded or grown)
+    def __init__(self, points, controls, curve, offsets, segments, tolerance=None, gpu=False, degree=2, seed=None):
+        self.points = points
+        self.controls = controls
+        self.curve = curve
+        self.offsets = offsets
+        self.segments = segments
+        self.tolerance = tolerance
+        self.gpu = gpu
+        self.degree = degree
+        self.seed = seed
+
+        # tables a Path traces and draws with, see measure
+        self.arcdata = None
+        self.lengths = None
+        self.bounds = None
+        self.bend = None
+
+        # (offset, scale) and int16 curve of a compact path, see pack
+        self.quant = None
+        self.packed = None
+
+    # number of arcs in the path
+    def arcs(self):
+        return len(self.points) - 1
+
+    # make the tables a Path needs (only the missing ones, eg. of a loaded file), where the path is
+    # made (the worker) so uploading only copies them
+    # arcdata [start, controls..., end] of every arc, lengths the distance along the path to every curve
+    # vertex (gpu paths are evaluated at their segments for it), bounds the box and bend the bend of each arc
+    def measure(self):
+        if self.arcdata is None:
+            self.arcdata = bezier.arcsFrom(self.points, self.controls, self.degree)
+        if self.lengths is None:
+            self.lengths = bezier.arcLengths(bezier.evaluate(self.arcdata, self.segments) if self.gpu else self.curve)
+        if self.bounds is None:
+            self.bounds = bezier.arcBounds(self.arcdata)
+        if self.bend is None:
+            self.bend = bezier.bend(self.arcdata)
+        return self
+
+    # store the curve as int16 positions in the box of the arcs as well (Path.compact), quantized where
+    # the path is made so uploading it is only copying the packed bytes (gpu curves have nothing to pack)
+    def pack(self):
+        if self.gpu or self.packed is not None:
+            return self
+        self.measure()
+        self.quant = quantization(self.bounds[:, 0].min(axis=0), self.bounds[:, 1].max(axis=0))
+        self.packed = quantize(self.curve, self.quant)
+        return self
+
+
+    # random endpoints and controls of count paths at once, (count, arcs + 1, 3) and (count, arcs * (degree - 1), 3)
+    # starting at the origin or continuing on from start, rng is a numpy Generator (or numpy.random)
+    # every number is drawn in one call then scaled into place, so the cost hardly depends on arcs
+    @staticmethod
+    def randomArcs(count, arcs, rng=numpy.random, start=None, degree=2):
+        controlCount = arcs * (degree - 1)
+        numbers = rng.random((count, arcs + controlCount + 1, 3))
+
+        # points holds endpoints of arcs, generate a point to go to from origin, then the rest of the endpoints
+        points = numpy.zeros((count, arcs + 1, 3), dtype=numpy.float32)  # always start at origin
+        points[:, 1:] = numbers[:, :arcs] * 10 - 5
+
+        # holds all the control points (degree - 1 per arc)
+        controls = (numbers[:, arcs:arcs + controlCount] * 8 - 4).astype(numpy.float32)
+
+        if start is None:
+            controls[:, 0] = numbers[:, -1] * 10 - 5     # initial control for the origin and second point
+        else:
+            points[:, 0] = start    # continue from the end of another path
+
+        return points, controls
+
+
+    # a new seed, for paths that can be made again
+    @staticmethod
+    def newSeed():
+        return int(numpy.random.SeedSequence().generate_state(1)[0])
+
+
+    # generate a random path, starting at the origin or continuing on from start
+    # from seed (the same seed and settings always give the same path, a new seed if None) or rng
+    # compact paths carry their curve packed as int16 as well (see pack)
+    @staticmethod
+    def generate(arcs, segments, gpu=False, tolerance=None, start=None, rng=None, degree=2, seed=None, compact=False):
+        if rng is None:
+            seed = PathData.newSeed() if seed is None else seed
+            rng = numpy.random.default_rng(seed)
+        points, controls = PathData.randomArcs(1, arcs, rng, start, degree)
+        data = PathData.fromArcs(points[0], controls[0], segments, gpu, tolerance, degree, seed)
+        return data.pack() if compact else data
+
+
+    # path through given endpoints (arcs + 1, 3) and controls (arcs * (degree - 1), 3)
+    @staticmethod
+    def fromArcs(points, controls, segments, gpu=False, tolerance=None, degree=2, seed=None):
+        points = numpy.ascontiguousarray(points, dtype=numpy.float32)
+        controls = numpy.ascontiguousarray(controls, dtype=numpy.float32)
+
+        # curve holds all arcs, every arc evaluated in one go
+        # (bezier part, arcs * segments vertices), left empty when the gpu evaluates it
+        if gpu:
+            curve = numpy.empty((0, 3), dtype=numpy.float32)
+            offsets = numpy.arange(len(points)) * segments
+        else:
+            curve, offsets = PathData.sample(bezier.arcsFrom(points, controls, degree), segments, tolerance)
+
+        return PathData(points, controls, curve, offsets, segments, tolerance, gpu, degree, seed).measure()
+
+
+    # sample arcs with fixed segments, or adaptively when there is a tolerance
+    # returns the curve vertices and the vertex offset of each arc
+    @staticmethod
+    def sample(arcs, segments, tolerance):
+        if tolerance is None:
+            return bezier.evaluate(arcs, segments), numpy.arange(len(arcs) + 1) * segments
+        return bezier.evaluateCounts(arcs, bezier.adaptiveSegments(arcs, tolerance, PathData.maxsegments))
+
+
+    # quadratic bezier method for the arc segments
+    # (original per vertex version, kept as the reference for bezier.evaluate)
+    @staticmethod
+    def calcNew(p0, p1, p2, segments):
+        segarcs = []
+        for i in range(0, segments):
+            t = (i)/(segments-1)
+            l0 = [ ((1-t)*p0[0]) + (t*p1[0]),
+                   ((1-t)*p0[1]) + (t*p1[1]),
+                   ((1-t)*p0[2]) + (t*p1[2]) ]
+            l1 = [ ((1-t)*p1[0]) + (t*p2[0]),
+                   ((1-t)*p1[1]) + (t*p2[1]),
+                   ((1-t)*p1[2]) + (t*p2[2]) ]
+            vert = [ ((1-t)*l0[0]) + (t*l1[0]),
+                     ((1-t)*l0[1]) + (t*l1[1]),
+                     ((1-t)*l0[2]) + (t*l1[2]) ]
+            segarcs.extend(vert)
+
+        return segarcs
+
+
+    # save to a .npz file
+    def save(self, file):
+        numpy.savez(file, points=self.points, controls=self.controls, curve=self.curve, offsets=self.offsets,
+                    settings=numpy.array([self.segments, -1 if self.tolerance is None else self.tolerance, self.gpu,
+                                          self.degree]))
+
+    # load a path saved with save
+    @staticmethod
+    def load(file):
+        with numpy.load(file) as npz:
+            segments, tolerance, gpu, degree = list(npz["settings"]) + [2] * (4 - len(npz["settings"]))  # older files are quadratic
+            return PathData(npz["points"], npz["controls"], npz["curve"], npz["offsets"], int(segments),
+                            None if tolerance < 0 else float(tolerance), bool(gpu), int(degree))
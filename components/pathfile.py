@@ -0,0 +1,98 @@
+import struct
+import numpy
+
+from components.pathdata import PathData
+
+# compact binary path file (.rbz)
+#
+#   header (64 bytes, little endian)
+#       magic "RBZP", version, flags, arcs, segments, tolerance, curve vertices, degree (version 2)
+#   points      (arcs + 1) * 3 float32
+#   controls    arcs * (degree - 1) * 3 float32
+#   offsets     (arcs + 1) int64, curve vertex each arc starts at
+#   curve       vertices * 3 float32 (only with FLAG_CURVE)
+#   lengths     float64 distance along the path to each curve vertex (only with FLAG_LENGTHS, as
+#               many as the curve has, or arcs * segments for gpu paths)
+#
+# every section is contiguous and padded to 8 bytes so loading is just memory mapping
+# the file, the arrays go to the gl buffers straight from the map without copies
+
+MAGIC = b"RBZP"
+VERSION = 2
+
+HEADER = struct.Struct("<4sIIIIdQ")
+DEGREE = struct.Struct("<I")    # after the version 1 header, version 1 files are quadratic
+HEADER_SIZE = 64
+
+FLAG_CURVE = 1      # sampled curve stored
+FLAG_GPU = 2        # curve evaluated by the shader
+FLAG_ADAPTIVE = 4   # tolerance is used (adaptive segments)
+FLAG_LENGTHS = 8    # length table stored (measured again on upload without it)
+
+
+# bytes to the next 8 byte boundary
+def padding(size):
+    return -size % 8
+
+
+# write a PathData to file
+def save(file, data):
+    flags = (FLAG_GPU if data.gpu else 0) | (FLAG_CURVE if len(data.curve) else 0)
+    flags |= FLAG_ADAPTIVE if data.tolerance is not None else 0
+    flags |= FLAG_LENGTHS if data.lengths is not None else 0
+
+    header = HEADER.pack(MAGIC, VERSION, flags, data.arcs(), data.segments,
+                         data.tolerance or 0.0, len(data.curve)) + DEGREE.pack(data.degree)
+
+    sections = [(data.points, "<f4"), (data.controls, "<f4"), (data.offsets, "<i8")]
+    if flags & FLAG_CURVE:
+        sections.append((data.curve, "<f4"))
+    if flags & FLAG_LENGTHS:
+        sections.append((data.lengths, "<f8"))
+
+    with open(file, "wb") as f:
+        f.write(header.ljust(HEADER_SIZE, b"\0"))
+        for array, dtype in sections:
+            array = numpy.ascontiguousarray(array, dtype=dtype)
+            f.write(array.data)
+            f.write(b"\0" * padding(array.nbytes))
+
+
+# memory map a path file as a PathData (read only arrays backed by the file)
+# (ValueError if it isn't a path file, or is cut short)
+def load(file):
+    with open(file, "rb") as f:
+        header = f.read(HEADER_SIZE)
+    if len(header) < HEADER.size + DEGREE.size or header[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{file} is not a path file")
+
+    magic, version, flags, arcs, segments, tolerance, vertices = HEADER.unpack_from(header)
+    degree, = DEGREE.unpack_from(header, HEADER.size) if version >= 2 else (2,)
+    if version > VERSION:
+        raise ValueError(f"{file} is path file version {version}, only up to {VERSION} supported")
+    if len(header) < HEADER_SIZE or degree < 2:
+        raise ValueError(f"{file} has a broken header")
+
+    mapped = numpy.memmap(file, dtype=numpy.uint8, mode="r")
+
+    # each section as a typed view of the map
+    offset = HEADER_SIZE
+    def section(dtype, shape):
+        nonlocal offset
+        count = int(numpy.prod(shape))
+        if offset + count * numpy.dtype(dtype).itemsize > len(mapped):
+            raise ValueError(f"{file} is cut short")
+        array = numpy.frombuffer(mapped, dtype=dtype, count=count, offset=offset).reshape(shape)
+        offset += array.nbytes + padding(array.nbytes)
+        return array
+
+    points = section("<f4", (arcs + 1, 3))
+    controls = section("<f4", (arcs * (degree - 1), 3))
+    offsets = section("<i8", (arcs + 1,))
+    curve = section("<f4", (vertices, 3)) if flags & FLAG_CURVE else numpy.empty((0, 3), dtype=numpy.float32)
+
+    data = PathData(points, controls, curve, offsets, segments,
+                    float(tolerance) if flags & FLAG_ADAPTIVE else None, bool(flags & FLAG_GPU), degree)
+    if flags & FLAG_LENGTHS:
+        data.lengths = section("<f8", (int(offsets[-1]),))
+    return data
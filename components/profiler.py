@@ -0,0 +1,120 @@
+import csv
+import json
+import time
+import ctypes
+import collections
+from contextlib import contextmanager
+from OpenGL.GL import *
+from OpenGL.raw.GL.VERSION.GL_3_3 import glGetQueryObjectui64v as glGetQueryObjectui64vRaw  # wrapped one fails on 64 bit results
+
+# per frame timings of the main loop stages (cpu) and their gl work (gpu timer queries)
+# gpu queries are double buffered, a stages query is read back the frame after it was
+# made (if the result is ready), so the cpu never waits on the gpu
+class Profiler():
+
+    def __init__(self, frames=300):
+        self.records = collections.deque(maxlen=frames)     # one dict of stage times (ms) per frame
+        self.record = None
+        self.counts = set()     # keys that are counts (eg. vertices drawn) not times
+
+        self.queries = {}   # stage: [query, query] used on alternate frames
+        self.pending = {}   # query: (record, key) waiting for its result
+        self.result = ctypes.c_uint64()
+        self.flip = 0
+        self.start = 0
+
+
+    # start timing a frame
+    def beginFrame(self):
+        self.record = {}
+        self.start = time.perf_counter()
+
+
+    # finish the frame, reads back any gpu times that are ready from earlier frames
+    def endFrame(self):
+        self.record["frame"] = (time.perf_counter() - self.start) * 1000
+        self.records.append(self.record)
+        self.flip = 1 - self.flip
+
+        for query, (record, key) in list(self.pending.items()):
+            if glGetQueryObjectuiv(query, GL_QUERY_RESULT_AVAILABLE):
+                glGetQueryObjectui64vRaw(query, GL_QUERY_RESULT, self.result)
+                record[key] = self.result.value / 1e6  # ns to ms
+                del self.pending[query]
+
+
+    # time a stage of the frame (with gpu, also the time the gpu spends on its gl calls)
+    @contextmanager
+    def stage(self, name, gpu=False):
+        query = None
+        if gpu:
+            if name not in self.queries:
+                self.queries[name] = glGenQueries(2)
+            query = self.queries[name][self.flip]
+
+            # still waiting on this query from two frames ago, skip gpu timing this frame
+            if query in self.pending:
+                query = None
+            else:
+                glBeginQuery(GL_TIME_ELAPSED, query)
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record[name] = (time.perf_counter() - start) * 1000
+            if query is not None:
+                glEndQuery(GL_TIME_ELAPSED)
+                self.pending[query] = (self.record, "gpu " + name)
+
+
+    # record a count for this frame (eg. vertices drawn), outside a frame its ignored
+    def count(self, name, value):
+        if self.record is not None:
+            self.record[name] = value
+            self.counts.add(name)
+
+
+    # column names in recorded order
+    def keys(self):
+        keys = []
+        for record in self.records:
+            keys.extend(key for key in record if key not in keys)
+        return keys
+
+
+    # times of one stage over the recorded frames
+    def values(self, key):
+        return [record[key] for record in self.records if key in record]
+
+
+    # percentiles (ms, or the count) of one stage
+    def percentiles(self, key, ps=(50, 95, 99)):
+        values = sorted(self.values(key))
+        if not values:
+            return [0.0 for p in ps]
+        return [values[min(len(values) - 1, int(len(values) * p / 100))] for p in ps]
+
+
+    # write the recorded frames to a .csv or .json file (by its extension)
+    def export(self, file):
+        keys = self.keys()
+
+        if file.endswith(".json"):
+            with open(file, "w") as f:
+                json.dump({"unit": "ms", "counts": sorted(self.counts), "frames": list(self.records),
+                           "percentiles": {key: dict(zip(("p50", "p95", "p99"), self.percentiles(key))) for key in keys}},
+                          f, indent=1)
+        else:
+            with open(file, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=keys)
+                writer.writeheader()
+                writer.writerows(self.records)
+
+
+    # delete the gpu queries
+    def release(self):
+        for queries in self.queries.values():
+            glDeleteQueries(2, queries)
+        self.queries = {}
+        self.pending = {}
@@ -0,0 +1,22 @@
+import numpy
+
+# compact int16 positions (no opengl, so paths can be packed where they are made)
+
+
+# (offset, scale) storing positions inside the box lo to hi as int16, a position is offset + q * scale
+# for q within +-32767, so every position is at most scale / 2 off (per axis)
+def quantization(lo, hi):
+    lo, hi = numpy.asarray(lo, dtype=numpy.float64), numpy.asarray(hi, dtype=numpy.float64)
+    return (hi + lo) / 2, numpy.maximum(hi - lo, 1e-9) / 65534
+
+def quantize(floats, quant):
+    offset, scale = quant
+    q = floats.reshape(-1, 3) - offset.astype(numpy.float32)   # in place float32 (twice as fast as float64)
+    q *= (1 / scale).astype(numpy.float32)
+    numpy.rint(q, out=q)
+    numpy.clip(q, -32767, 32767, out=q)
+    return q.astype(numpy.int16).reshape(-1)
+
+def dequantize(values, quant):
+    offset, scale = quant
+    return (values.reshape(-1, 3) * scale + offset).astype(numpy.float32).reshape(-1)
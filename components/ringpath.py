@@ -0,0 +1,148 @@
+import numpy
+from OpenGL.GL import *
+
+from components import bezier
+from components.pathdata import PathData
+from components.buffer import vertexArray
+
+# endless path that keeps only the newest arcs (window) in fixed size buffers
+# new arcs overwrite the oldest arcs in place, so memory stays flat however long it runs
+class RingPath():
+
+    quant = None    # curve always stored as floats
+
+    def __init__(self, window, segments):
+        self.gpu = False    # curve always evaluated on the cpu
+
+        # generate vaos/vbos for path objects, made once and reused when regenerated
+        self.pathvao, self.pointsvao, self.controlsvao = glGenVertexArrays(3)
+        self.pathvbo, self.pointsvbo, self.controlsvbo = glGenBuffers(3)
+        self.released = False
+
+        self.regenerate(window, segments)
+
+
+    # start a new empty stream, buffer storage is orphaned and reallocated for the new window
+    def regenerate(self, window, segments):
+        self.window = window        # arcs kept on screen
+        self.segments = segments    # segments of every arc
+
+        self.added = 0      # arcs added in total
+        self.filled = 0     # slots holding an arc (up to window)
+
+        # end of the newest arc, next arc starts here (starts at origin)
+        self.last = numpy.zeros(3, dtype=numpy.float32)
+
+        # distance along the stream to the end of the newest arc, and to each vertex of the
+        # newest arc (the one being traced) with its [start, control, end]
+        self.end = 0.0
+        self.newestLengths = numpy.zeros(segments)
+        self.newestArc = None
+
+        # preallocate the whole window (one arc per slot, arc endpoints and controls one vertex per slot)
+        self.allocate(self.pathvao, self.pathvbo, window * segments)
+        self.allocate(self.pointsvao, self.pointsvbo, window)
+        self.allocate(self.controlsvao, self.controlsvbo, window)
+
+
+    # slot of the oldest arc (where the curve starts)
+    def head(self):
+        return self.added % self.window if self.filled == self.window else 0
+
+
+    # add n random arcs, only the last window of them are generated (older ones would be overwritten)
+    def addArcs(self, n):
+        m = min(n, self.window)
+
+        new = PathData.generate(m, self.segments, start=self.last)
+
+        self.last = new.points[-1]
+
+        # new arcs carry on from the end of the stream (skipped arcs, over a window, add no length)
+        self.newestLengths = bezier.arcLengths(new.curve)[(m - 1) * self.segments:] + self.end
+        self.newestArc = bezier.arcsFrom(new.points, new.controls)[-1]
+        self.end = self.newestLengths[-1]
+
+        self.added += n
+        self.filled = min(self.filled + n, self.window)
+
+        # the new arcs fill the slots up to the newest, wrapping round to the start of the buffers
+        slot = (self.added - m) % self.window
+        split = min(m, self.window - slot)
+        for first, arcs in ((slot, slice(0, split)), (0, slice(split, m))):
+            if arcs.start == arcs.stop:
+                continue
+            self.write(self.pathvbo, first * self.segments, new.curve.reshape(m, -1)[arcs])
+            self.write(self.pointsvbo, first, new.points[1:][arcs])
+            self.write(self.controlsvbo, first, new.controls[arcs])
+
+
+    # curve vertex reached after tracing distance along the stream (counted from the oldest arc on
+    # screen) and the partly traced segment on from it, adds arcs as the trace reaches the end of the
+    # newest (at most a window of them a frame)
+    def trace(self, distance):
+        for i in range(self.window):
+            if distance < self.end:
+                break
+            self.addArcs(1)
+
+        k = int(numpy.searchsorted(self.newestLengths, distance, side="right")) - 1
+        k = min(max(k, 0), self.segments - 1)
+        index = (self.filled - 1) * self.segments + k
+        if k + 1 >= self.segments or self.newestLengths[k + 1] == self.newestLengths[k]:
+            return index, None
+
+        f = (distance - self.newestLengths[k]) / (self.newestLengths[k + 1] - self.newestLengths[k])
+        return index, bezier.partialSegment(self.newestArc, k, self.segments, f)
+
+
+    # number of curve vertices on screen
+    def curveVertices(self):
+        return self.filled * self.segments
+
+    def pointVertices(self):
+        return self.filled
+
+    def controlVertices(self):
+        return self.filled
+
+
+    # vertex ranges that draw the first n vertices of the curve from the oldest arc, [(vao, first, counts)]
+    # two ranges once the window has wrapped (oldest slots to the end, then the start of the buffer)
+    # (no culling or levels of detail, the window is only a few arcs)
+    def draws(self, n, viewproj=None, pixels=None, height=800, cull=True):
+        first = self.head() * self.segments
+        tail = self.curveVertices() - first
+        if n <= tail:
+            return [(self.pathvao, numpy.array([first], dtype=numpy.int32), numpy.array([n], dtype=numpy.int32))]
+        return [(self.pathvao, numpy.array([first, 0], dtype=numpy.int32), numpy.array([tail, n - tail], dtype=numpy.int32))]
+
+
+    # fixed size vertex buffer for count xyz vertices
+    @staticmethod
+    def allocate(vao, vbo, count):
+        glBindBuffer(GL_ARRAY_BUFFER, vbo)
+        glBufferData(GL_ARRAY_BUFFER, count * 12, None, GL_DYNAMIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        vertexArray(vao, vbo)
+
+
+    # overwrite vertices in place starting at vertex first
+    @staticmethod
+    def write(vbo, first, verts):
+        verts = numpy.ascontiguousarray(verts, dtype=numpy.float32)
+        glBindBuffer(GL_ARRAY_BUFFER, vbo)
+        glBufferSubData(GL_ARRAY_BUFFER, first * 12, verts.nbytes, verts)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+
+    # delete buffer data and vao (path can't be used after)
+    def release(self):
+        if self.released:
+            return
+        glDeleteVertexArrays(3, (self.pathvao, self.pointsvao, self.controlsvao))
+        glDeleteBuffers(3, (self.pathvbo, self.pointsvbo, self.controlsvbo))
+        self.released = True
+
+    def __del__(self):
+        self.release()
@@ -0,0 +1,699 @@
+import time
+import glm
+import numpy
+from OpenGL.GL import *
+
+from components.shader import Shader
+from components.axis import Axis
+from components.path import Path
+from components.pathdata import PathData
+from components.pathcache import PathCache
+from components.worker import PathWorker, CollectionWorker
+from components.profiler import Profiler
+from components.glstate import GLState
+
+
+PATH_VERTEX = "shaders/path_vert.glsl"
+PATH_FRAGMENT = "shaders/path_frag.glsl"
+AXIS_VERTEX = "shaders/axis_vert.glsl"
+AXIS_FRAGMENT = "shaders/axis_frag.glsl"
+
+
+class Scene():
+    WIDTH = 1000
+    HEIGHT = 800
+
+    IDLE_WAIT = 0.5     # longest an idle window sleeps between checks (seconds)
+    REDRAW_FRAMES = 3   # frames drawn after any input (the ui takes a couple of frames to settle)
+    HISTORY = 50        # paths remembered to go back to
+
+    # offscreen renders into a framebuffer through a headless gl context (egl/osmesa) instead of
+    # a window, with no ui, and doesnt start the main loop (call frame() for each frame)
+    # (components.offscreen has to be imported before anything imports OpenGL)
+    def __init__(self, offscreen=False):
+
+        # init window and context
+        if offscreen:
+            self.initOffscreen()
+        else:
+            self.initWindow()
+
+        # setup shader programs
+        self.path_shader = Shader.gen_shader(PATH_VERTEX, PATH_FRAGMENT)
+        self.axis_shader = Shader.gen_shader(AXIS_VERTEX, AXIS_FRAGMENT)
+
+        self.clear_colour = (0.160, 0.294, 0.305)   # back colour
+
+        # gl configure
+        glClearColor(*self.clear_colour, 1.0)
+        if self.window is not None:
+            glViewport(220, 0, Scene.WIDTH - 220, Scene.HEIGHT)     # right of the ui
+        glEnable(GL_DEPTH_TEST)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+
+        # imgui UI object (window only, imgui isnt needed offscreen)
+        self.ui = None
+        if self.window is not None:
+            from components.ui import UI
+            self.ui = UI(window=self.window)
+            self.watchInput()
+
+        # store reference to shader uniforms
+        self.col_uni = glGetUniformLocation(self.path_shader, "ucol")   # paths shader uniforms
+        self.view_uni = glGetUniformLocation(self.path_shader, "view")
+        self.proj_uni = glGetUniformLocation(self.path_shader, "proj")
+        self.gpucurve_uni = glGetUniformLocation(self.path_shader, "gpucurve")
+        self.arcsegments_uni = glGetUniformLocation(self.path_shader, "arcsegments")
+        self.degree_uni = glGetUniformLocation(self.path_shader, "degree")
+        self.tipline_uni = glGetUniformLocation(self.path_shader, "tipline")
+        self.tip_uni = glGetUniformLocation(self.path_shader, "tip")
+        self.quantscale_uni = glGetUniformLocation(self.path_shader, "quantscale")
+        self.quantoffset_uni = glGetUniformLocation(self.path_shader, "quantoffset")
+        self.morph_uni = glGetUniformLocation(self.path_shader, "morph")
+
+        self.view_uni_axis = glGetUniformLocation(self.axis_shader, "view") # axis shader uniforms 
+        self.proj_uni_axis = glGetUniformLocation(self.axis_shader, "proj")
+
+        # default camera transform
+        self.positionCamera = glm.vec3(0.0, -0.6, -6)   # move camera back origin
+        self.rotationCamera = glm.vec3(25, -45, 0.0)
+        self.scaleCamera = 0.92
+
+        # create and set perspective matrix in both shader programs as uniforms (only set once)
+        proj = glm.perspective(90, 1, 0.1, 200)
+        glUseProgram(self.axis_shader)
+        glUniformMatrix4fv(self.proj_uni_axis, 1, GL_FALSE, glm.value_ptr(proj))
+        glUseProgram(self.path_shader)
+        glUniformMatrix4fv(self.proj_uni, 1, GL_FALSE, glm.value_ptr(proj))
+        self.proj = proj
+        self.view = glm.mat4(1.0)   # last frames view (picking)
+
+        # texture units of the points/controls texture buffers (gpu curve)
+        glUniform1i(glGetUniformLocation(self.path_shader, "points"), 0)
+        glUniform1i(glGetUniformLocation(self.path_shader, "controls"), 1)
+
+        # axis ( x y z lines )
+        self.axis = Axis()
+
+        # recently generated paths by seed and settings (going back to one is instant)
+        self.cache = PathCache()
+
+        # path is the programs entire curve (data/buffer/vao/settings)
+        self.path = Path(self.cache.generate(**Path.settings()))
+
+        # settings (with seeds) of the paths viewed, to go back and forward through, and the one shown
+        self.history = [dict(Path.settings(), seed=self.path.seed)]
+        self.historyIndex = 0
+
+        # new paths are generated in the background then uploaded to the spare path and swapped in
+        self.worker = PathWorker(self.cache)
+        self.spare = None
+        if self.window is not None:
+            self.worker.notify = self.glfw.post_empty_event  # wakes an idle window when a path is ready
+
+        # streaming path (endless ring of the newest arcs), drawn instead of path when set
+        self.stream = None
+
+        # new paths morph from the last one over morphTime seconds (whole curve drawn) rather than
+        # being traced from the start, clock time the current morph started (None when not morphing)
+        self.morph = False
+        self.morphTime = 1.0
+        self.morphStart = None
+
+        # live feed of arcs from another process (components.feed), added to the end of path when set
+        self.feed = None
+        self.feedError = None   # why the feed couldn't listen (eg. the address in use, shown in the ui)
+
+        # many random paths drawn together (fully traced) alongside the path, size of the next one, the seed
+        # of the one shown (the same seed and settings make the same collection) and the worker generating it
+        self.collection = None
+        self.collectionSize = 500
+        self.collectionSeed = None
+        self.collectionCount = 0    # paths it will have once generated
+        self.collectionWorker = None
+
+        # only draw arcs in view, and the point/control picked with the mouse (("point" or "control", index))
+        self.cull = True
+        self.selected = None
+
+        # draw far arcs with fewer segments, at most lodPixels off the real curve on screen
+        self.lod = True
+        self.lodPixels = 0.5
+
+        # draw index of the curve (used to draw the path out over time)
+        self.pathIndex = 0
+
+        # some path/camera settings
+        self.turn = True
+        self.pathTime = 0
+        self.startTime = 0
+        self.timeMultipler = 5     # trace speed (units per second along the path)
+        self.showControls = True
+        self.showPoints = True
+        self.showSegments = False
+        self.showAxis = True
+        self.grow = False   # keep adding arcs once the path is traced out
+        self.pathFile = "path.rbz"  # file for save/load path
+        self.pathFileError = None   # why the last save/load failed (shown in the ui)
+
+        # frame timings (rolling window of frames)
+        self.profiler = Profiler()
+
+        # skips gl calls that wouldnt change anything, and the camera the view matrix was made for
+        self.gl = GLState()
+        self.camera = None
+
+        # idle only draws a frame when something on screen would change (camera, trace, path or ui)
+        # and otherwise sleeps until there's input, instead of drawing as fast as it can
+        self.idle = True
+        self.redraw = Scene.REDRAW_FRAMES   # frames still to draw after input
+        self.traced = False     # the path was drawn fully traced last frame
+        self.profileFile = "profile.csv"    # file for exported timings (.csv or .json)
+
+        # frame capture, while recording the path is traced by a fixed timestep per frame
+        # instead of the clock (so captures are the same every time and can render faster than real time)
+        self.capture = None
+        self.captureFile = "frames"     # directory of png frames or a .gif file (needs Pillow)
+        self.captureError = None        # why the last capture couldn't start (shown in the ui)
+        self.timestep = 0
+        self.simTime = 0
+
+        self.startTime = self.clock()
+
+        if self.window is not None:
+            self.run()
+
+
+    # glfw window and its context
+    def initWindow(self):
+        # imported here rather than with the module so offscreen scenes (benchmarks, cli captures)
+        # don't need glfw installed, kept on the scene for the window's main loop and callbacks
+        import glfw
+        self.glfw = glfw
+
+        glfw.init()
+        glfw.window_hint(glfw.CONTEXT_VERSION_MAJOR, 3)
+        glfw.window_hint(glfw.CONTEXT_VERSION_MINOR, 3)
+        glfw.window_hint(glfw.OPENGL_PROFILE, glfw.OPENGL_CORE_PROFILE)
+
+        # glfw window
+        self.window = glfw.create_window(Scene.WIDTH, Scene.HEIGHT, "random-bezier", None, None)
+
+        glfw.set_window_attrib(self.window, glfw.RESIZABLE, False)
+        glfw.set_window_pos(self.window, 200, 100)
+        glfw.make_context_current(self.window)
+        glfw.swap_interval(0)   # vsync enabled/disabled
+
+        self.offscreen = None
+        self.clock = glfw.get_time  # time source the path is traced by
+
+
+    # headless context with a framebuffer the size of the scene part of the window
+    def initOffscreen(self):
+        from components.offscreen import OffscreenContext
+
+        self.offscreen = OffscreenContext(Scene.WIDTH - 220, Scene.HEIGHT)
+        self.window = None
+        self.glfw = None
+        self.clock = time.perf_counter
+
+
+    def run(self):
+
+        self.startTime = self.clock()
+
+        while not self.glfw.window_should_close(self.window):
+            if self.idle and not self.changing():
+                self.glfw.wait_events_timeout(Scene.IDLE_WAIT)   # sleeps until input (or a path is ready)
+                continue
+            self.frame()
+
+        # terminate after loop
+        self.end()
+
+
+    # true if the next frame would differ from the last one drawn
+    def changing(self):
+        camera = (tuple(self.positionCamera), tuple(self.rotationCamera), self.scaleCamera)
+        return (self.redraw > 0 or self.turn or not self.traced or camera != self.camera
+                or self.stream is not None or self.capture is not None or self.worker.finished()
+                or self.morphStart is not None
+                or (self.feed is not None and self.feed.pending())
+                or (self.collectionWorker is not None and self.collectionWorker.busy()))
+
+
+    # any input on the window (keys, mouse, scroll, focus or the window needing a redraw) marks it to be
+    # redrawn, chained in front of the ui renderers own callbacks
+    def watchInput(self):
+        def watch(previous):
+            def callback(*args):
+                self.redraw = Scene.REDRAW_FRAMES
+                if previous is not None:
+                    previous(*args)
+            return callback
+
+        glfw = self.glfw
+        for setCallback in (glfw.set_key_callback, glfw.set_char_callback, glfw.set_scroll_callback,
+                            glfw.set_mouse_button_callback, glfw.set_cursor_pos_callback,
+                            glfw.set_window_focus_callback, glfw.set_window_refresh_callback):
+            previous = setCallback(self.window, None)
+            setCallback(self.window, watch(previous))
+
+
+    # one frame, each stage of the frame is timed (cpu and gpu) for the profiling section of the ui
+    # (offscreen there are no events, ui or swap, the scene is just drawn into the framebuffer)
+    def frame(self):
+        self.profiler.beginFrame()
+        self.gl.resetCounts()
+        self.redraw = max(0, self.redraw - 1)
+
+        if self.window is not None:
+            with self.profiler.stage("poll"):
+                self.glfw.poll_events()
+
+        with self.profiler.stage("scene", gpu=True):
+            glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+
+            # swap in a newly generated path if one is ready, and add arcs that have arrived on the feed
+            self.swapPath()
+            self.drainFeed()
+            self.fillCollection()
+
+            # render(and updates) enitre scene
+            self.render()
+
+        # read the scene back (before the ui is drawn over it) and step the simulated time
+        if self.capture is not None:
+            with self.profiler.stage("capture"):
+                self.capture.capture()
+            self.simTime += self.timestep
+
+        if self.window is not None:
+            # render ui
+            with self.profiler.stage("ui", gpu=True):
+                self.ui.render(scene=self)
+
+            with self.profiler.stage("swap"):
+                self.glfw.swap_buffers(self.window)
+
+        # gl calls made by the scene and the ones the state cache skipped
+        self.profiler.count("gl calls", sum(self.gl.calls.values()))
+        self.profiler.count("gl saved", sum(self.gl.saved.values()))
+
+        self.profiler.endFrame()
+
+    
+    # start recording frames to out (.gif file, otherwise a directory of png frames)
+    # at fps, the path is retraced from the start using simulated time
+    def startCapture(self, out, fps=50):
+        from components.capture import FrameCapture
+
+        x = 220 if self.window is not None else 0
+        fmt = "gif" if out.endswith(".gif") else "png"
+        self.capture = FrameCapture(x, 0, Scene.WIDTH - 220, Scene.HEIGHT, out, fps, fmt)
+
+        self.realClock = self.clock
+        self.clock = self.simulatedTime
+        self.timestep = 1 / fps
+        self.simTime = 0
+        self.startTime = 0
+
+
+    # stop recording, waits for the frames to be written (returns how many were)
+    def stopCapture(self):
+        frames = self.capture.finish()
+        self.capture = None
+
+        # carry on tracing from the same point in real time
+        self.clock = self.realClock
+        self.startTime = self.clock() - (self.simTime - self.startTime)
+        return frames
+
+
+    # fixed timestep time used while capturing
+    def simulatedTime(self):
+        return self.simTime
+
+
+    # generate a path in the background (Path.settings() keyword arguments), remembered in the history
+    # after the one shown (a new seed is picked here for seed=None, so it can be made again)
+    def requestPath(self, **settings):
+        if settings.get("seed") is None:
+            settings["seed"] = PathData.newSeed()
+        del self.history[self.historyIndex + 1:]
+        self.history.append(settings)
+        del self.history[:-Scene.HISTORY]
+        self.historyIndex = len(self.history) - 1
+        self.worker.request(self.morphSource(), **settings)
+
+
+    # show the path step places back (-1) or forward (1) in the history, false if there is none
+    def flipPath(self, step):
+        index = self.historyIndex + step
+        if not 0 <= index < len(self.history):
+            return False
+        self.historyIndex = index
+        self.worker.request(self.morphSource(), **self.history[index])
+        return True
+
+
+    # (curve, lengths) of the path shown for the next path to morph from, None if not morphing
+    # (or it has no curve vertices, a gpu curve), the worker reads them while this thread carries on,
+    # so the curve is a copy (the curve buffer is written in place by a load or a compact append), the
+    # lengths table is never written under a view of it (see GrowableArray)
+    def morphSource(self):
+        if not self.morph or self.stream is not None or self.path.gpu:
+            return None
+        return self.path.curve.reshape(-1, 3).copy(), self.path.lengths
+
+
+    # how much of the last path is still mixed into the curve (1 to 0, eased), None when not morphing
+    # ends the morph once morphTime has passed, the new path is left fully traced (or straight away
+    # if the path stopped morphing, eg. arcs were added, or a streaming path is shown instead)
+    def morphAmount(self):
+        if self.morphStart is None:
+            return None
+        t = (self.clock() - self.morphStart) / self.morphTime
+        if t < 1 and self.path.morphing and self.stream is None:
+            return 1 - t * t * (3 - 2 * t)
+
+        self.path.endMorph()
+        self.morphStart = None
+        # a second past the end of the trace, so rounding can't leave it a hair short (and not traced)
+        self.startTime = self.clock() - self.path.length() / self.timeMultipler - 1
+        return None
+
+
+    # listen for a live feed of arcs on address (see components.feed), or stop with None
+    def listenFeed(self, address):
+        if self.feed is not None:
+            self.feed.close()
+            self.feed = None
+        if address is None:
+            return
+
+        from components.feed import PathFeed    # asyncio/sockets only imported when used
+        self.feed = PathFeed(address)
+        if self.window is not None:
+            self.feed.notify = self.glfw.post_empty_event  # wakes an idle window when arcs arrive
+
+
+    # add every arc that has arrived on the feed since the last frame to the path (all in one append)
+    def drainFeed(self):
+        if self.feed is None:
+            return
+        arcs = self.feed.drain(self.path.deg)
+        if arcs is not None:
+            self.path.append_points(*arcs)
+        self.profiler.count("fed arcs", 0 if arcs is None else len(arcs[0]))
+
+
+    # a new collection of count random paths (the current arcs/segments/degree/compact settings) from seed
+    # (a new one if None), generated a chunk at a time by the collection worker and added as chunks finish
+    # (the window keeps drawing meanwhile), at most PathCollection.maxVertices curve vertices
+    def newCollection(self, count, seed=None):
+        from components.collection import PathCollection
+        if self.collection is not None and self.collection.compact != Path.compact:
+            self.clearCollection()
+        if self.collection is None:
+            self.collection = PathCollection(compact=Path.compact)
+        self.collection.clear()
+
+        if self.collectionWorker is None:
+            self.collectionWorker = CollectionWorker()
+            if self.window is not None:
+                self.collectionWorker.notify = self.glfw.post_empty_event     # wakes an idle window when a chunk is ready
+
+        self.collectionCount = min(count, PathCollection.maxVertices // (Path.arcs * Path.arcsegments))
+        self.collection.reserve(self.collectionCount, Path.arcs, Path.arcs * Path.arcsegments, Path.degree)
+        self.collectionSeed = PathData.newSeed() if seed is None else seed
+        self.collectionWorker.request(self.collectionCount, Path.arcs, Path.arcsegments, self.collectionSeed,
+                                      Path.degree, self.collection.quant)
+
+    # remove the collection (and stop generating it)
+    def clearCollection(self):
+        if self.collectionWorker is not None:
+            self.collectionWorker.cancel()
+        if self.collection is not None:
+            self.collection.release()
+            self.collection = None
+
+    # add the chunks of the collection the worker has finished since the last frame
+    def fillCollection(self):
+        if self.collectionWorker is None or self.collection is None:
+            return
+        for chunk in self.collectionWorker.take():
+            self.collection.addBatch(*chunk)
+
+
+    # upload a path finished by the worker into the spare path and swap it with the current one
+    # (current path keeps drawing until then, gl calls stay on this thread)
+    def swapPath(self):
+        data, source = self.worker.take()
+        if data is None:
+            return
+
+        if self.spare is None:
+            self.spare = Path(data)
+        else:
+            self.spare.upload(data)
+
+        self.path, self.spare = self.spare, self.path
+        self.startTime = self.clock()    # trace the new path from the start
+
+        # or morph it from the last one, all on the gpu (only the morph uniform changes a frame)
+        self.morphStart = None
+        if source is not None and self.stream is None:
+            self.path.startMorph(source)
+            self.morphStart = self.clock()
+
+    
+    # view matrix from the cameras transform, only rebuilt when the camera has moved
+    def viewMatrix(self):
+        camera = (tuple(self.positionCamera), tuple(self.rotationCamera), self.scaleCamera)
+        if camera != self.camera:
+            view = glm.mat4(1.0)
+            view = glm.translate(view, self.positionCamera)
+            view = glm.rotate(view, glm.radians(self.rotationCamera[0]), glm.vec3(1.0, 0.0, 0.0))
+            view = glm.rotate(view, glm.radians(self.rotationCamera[1]), glm.vec3(0.0, 1.0, 0.0))
+            view = glm.rotate(view, glm.radians(self.rotationCamera[2]), glm.vec3(0.0, 0.0, 1.0))
+            view = glm.scale(view, glm.vec3(self.scaleCamera))
+            self.view = view
+            self.camera = camera
+        return self.view
+
+
+    # main scene render/update
+    def render(self):
+ 
+        # calc how much of path to draw based on time elapsed (at timeMultipler units per second)
+        # (all of it while morphing)
+        morph = self.morphAmount()
+        self.pathTime = self.clock() - self.startTime
+        distance = self.pathTime * self.timeMultipler if morph is None else self.path.length()
+
+        # vertex the trace has reached and the partial segment on from it
+        # (a streaming path adds arcs as the trace reaches the end of the newest one)
+        path = self.stream if self.stream is not None else self.path
+        self.pathIndex, tip = path.trace(distance)
+
+        # growing path, add another arc when the end is reached (only the new arc is uploaded)
+        if self.stream is None and self.grow and distance >= path.length():
+            path.append_arcs(1)
+        self.traced = self.stream is None and not self.grow and distance >= path.length()
+
+        # small camera rotate  
+        if self.turn: 
+            self.rotationCamera[1] += 0.006     # amount of turn
+        
+        view = self.viewMatrix()
+
+        # arcs to draw (culled and lod levels picked), before any binding as making the lod levels
+        # uploads a buffer (leaving no vao bound), morphing every vertex moves so all of them are
+        # drawn (no culling by the new arcs boxes, and lod levels have no morph positions)
+        if morph is not None:
+            draws = [(path.pathvao, numpy.zeros(1, dtype=numpy.int32), numpy.full(1, path.curveVertices(), dtype=numpy.int32))]
+        else:
+            viewproj = numpy.array(self.proj * view) if self.cull or self.lod else None
+            draws = path.draws(self.pathIndex + 1, viewproj, self.lodPixels if self.lod else None, Scene.HEIGHT, self.cull)
+        self.gl.forget()
+
+        
+        # use axis shader       
+        self.gl.useProgram(self.axis_shader)
+
+        # sets the view matrix uniform in the axis shader (doesnt need model matrix, as axis is constant transform)
+        self.gl.uniformMatrix4(self.view_uni_axis, view)
+
+
+        # axis draw
+        glLineWidth(1)
+        if self.showAxis:
+            self.gl.bindVertexArray(self.axis.vao)
+            glDrawArrays(GL_LINES, 0, self.axis.ngrid)
+
+
+        # use path shader
+        self.gl.useProgram(self.path_shader)
+
+
+        # set the view uniform (previously calcualted) now in the path shader
+        self.gl.uniformMatrix4(self.view_uni, view)
+
+        # set the paths colour uniform in shader
+        colour = glm.vec4(1.0, 1.0, 1.0, 0.9)
+        self.gl.uniform4f(self.col_uni, colour)
+        
+        # gpu curve evaluates the path vertices in the shader from the points/controls buffers
+        if path.gpu:
+            self.gl.uniform1i(self.gpucurve_uni, 1)
+            self.gl.uniform1i(self.arcsegments_uni, Path.arcsegments)
+            self.gl.uniform1i(self.degree_uni, path.deg)
+            glActiveTexture(GL_TEXTURE0)
+            glBindTexture(GL_TEXTURE_BUFFER, path.pointstex)
+            glActiveTexture(GL_TEXTURE1)
+            glBindTexture(GL_TEXTURE_BUFFER, path.controlstex)
+
+        # bind the path vao and draw the path (curve itself - made of arcs each with segments )
+        # (a compact curve and its lod levels are scaled back into the paths box)
+        self.quantUniforms(path.quant)
+        self.gl.uniform1f(self.morph_uni, morph or 0.0)
+        # only the runs of arcs in view when culling, all in one multi draw per vao
+        # (a wrapped streaming path is drawn in two parts, with lod far arcs come from the coarser levels)
+        vertices = 0
+        for vao, first, counts in draws:
+            if len(counts):
+                self.gl.bindVertexArray(vao)
+                glMultiDrawArrays(GL_LINE_STRIP, first, counts, len(counts))
+                vertices += int(counts.sum())
+        self.profiler.count("vertices", vertices)
+        self.gl.bindVertexArray(path.pathvao)
+
+        # partly traced segment at the end, a line between tip points set in the shader
+        if tip is not None:
+            self.gl.uniform1i(self.tipline_uni, 1)
+            glUniform3fv(self.tip_uni, 2, numpy.array(tip, dtype=numpy.float32))
+            glDrawArrays(GL_LINES, 0, 2)
+            self.gl.uniform1i(self.tipline_uni, 0)
+
+        # draw each segment of each arc of the curve (every point of the curve)
+        if self.showSegments:
+            # use slightly different colour for segments of curve
+            colour = glm.vec4(0.8, 0.8, 0.8, 0.7)
+            self.gl.uniform4f(self.col_uni, colour)
+            glPointSize(1)
+            glDrawArrays(GL_POINTS, 0, path.curveVertices())
+
+        # points/controls always use their own vertex buffers (and dont morph)
+        self.gl.uniform1i(self.gpucurve_uni, 0)
+        self.gl.uniform1f(self.morph_uni, 0.0)
+        self.quantUniforms(None)
+        
+
+        # draw the points of curve (start and end points of each arc), not until a morph has finished
+        if self.showPoints and morph is None:
+            colour = glm.vec4(1.0, 1.0, 1.0, 0.8)
+            self.gl.uniform4f(self.col_uni, colour)
+            glPointSize(4)
+            self.gl.bindVertexArray(path.pointsvao)
+            glDrawArrays(GL_POINTS, 0, path.pointVertices())
+ 
+
+        # draws the controls of the bezier arcs (one control point for every two arc endpoints)
+        if self.showControls and morph is None:
+            colour = glm.vec4(1.0, 0.5, 0.2, 1.0)
+            self.gl.uniform4f(self.col_uni, colour)
+            glPointSize(3)
+            self.gl.bindVertexArray(path.controlsvao)
+            glDrawArrays(GL_POINTS, 0, path.controlVertices())
+
+        # picked point/control drawn bigger on top
+        if self.selected is not None and path is self.path:
+            kind, index = self.selected
+            vao, vertices = ((path.pointsvao, path.pointVertices()) if kind == "point" else
+                             (path.controlsvao, path.controlVertices()))
+            if index < vertices:
+                colour = glm.vec4(1.0, 1.0, 0.3, 1.0)
+                self.gl.uniform4f(self.col_uni, colour)
+                glPointSize(9)
+                self.gl.bindVertexArray(vao)
+                glDrawArrays(GL_POINTS, index, 1)
+
+
+        # draws the collection, every curve in one multi draw then all points and controls
+        if self.collection is not None:
+            colour = glm.vec4(0.7, 0.85, 1.0, 0.5)
+            self.gl.uniform4f(self.col_uni, colour)
+            self.gl.bindVertexArray(self.collection.pathvao)
+            self.quantUniforms(self.collection.quant)
+            self.collection.drawCurves()
+            self.quantUniforms(None)
+
+            if self.showPoints:
+                colour = glm.vec4(1.0, 1.0, 1.0, 0.6)
+                self.gl.uniform4f(self.col_uni, colour)
+                glPointSize(2)
+                self.gl.bindVertexArray(self.collection.pointsvao)
+                glDrawArrays(GL_POINTS, 0, self.collection.pointVertices())
+
+            if self.showControls:
+                colour = glm.vec4(1.0, 0.5, 0.2, 0.6)
+                self.gl.uniform4f(self.col_uni, colour)
+                glPointSize(2)
+                self.gl.bindVertexArray(self.collection.controlsvao)
+                glDrawArrays(GL_POINTS, 0, self.collection.controlVertices())
+
+
+
+    # scale/offset uniforms for vertices stored with quant ((offset, scale) of compact buffers, None for floats)
+    def quantUniforms(self, quant):
+        offset, scale = quant if quant is not None else ((0.0, 0.0, 0.0), (1.0, 1.0, 1.0))
+        self.gl.uniform3f(self.quantscale_uni, scale)
+        self.gl.uniform3f(self.quantoffset_uni, offset)
+
+
+    # point or control of the path under pixel x, y of the scene view (top left origin, right of
+    # the ui), the ray through the pixel from the camera is picked against the paths points bvh
+    # returns ("point" or "control", index) or None
+    def pick(self, x, y, radius=0.15):
+        return self.path.pick(*self.ray(x, y), radius)
+
+    # (origin, direction) of the ray from the camera through pixel x, y of the scene view
+    def ray(self, x, y):
+        nx = x / (Scene.WIDTH - 220) * 2 - 1
+        ny = 1 - y / Scene.HEIGHT * 2
+
+        inverse = glm.inverse(self.proj * self.view)
+        near = inverse * glm.vec4(nx, ny, -1, 1)
+        far = inverse * glm.vec4(nx, ny, 1, 1)
+        near, far = glm.vec3(near) / near.w, glm.vec3(far) / far.w
+        return tuple(near), tuple(far - near)
+
+
+    # delete buffer/array/shaders and terminte ui/window
+    def end(self):
+        if self.capture is not None:
+            self.stopCapture()
+        self.profiler.release()
+        self.path.release()
+        if self.spare is not None:
+            self.spare.release()
+        if self.stream is not None:
+            self.stream.release()
+        if self.feed is not None:
+            self.feed.close()
+        if self.collectionWorker is not None:
+            self.collectionWorker.cancel()
+        if self.collection is not None:
+            self.collection.release()
+        del self.axis
+        Shader.del_shader(self.path_shader)
+        Shader.del_shader(self.axis_shader)
+
+        if self.window is not None:
+            self.ui.renderer.shutdown()
+            self.glfw.destroy_window(self.window)
+            self.glfw.terminate()
+        else:
+            self.offscreen.release()
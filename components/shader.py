@@ -1,8 +1,17 @@
-from OpenGL.GL.shaders import compileProgram, compileShader
-from OpenGL.GL import glDeleteProgram, GL_VERTEX_SHADER, GL_FRAGMENT_SHADER
+import os
+import ctypes
+import hashlib
+import struct
+from OpenGL.GL.shaders import compileShader
+from OpenGL.GL import *
+from OpenGL.error import GLError
 
 class Shader():
 
+    # linked programs are saved here (as driver specific binaries) and loaded on the next start
+    # instead of compiling, keyed on the shader sources and the driver (None to always compile)
+    cacheDir = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "random-bezier", "shaders")
+
     @staticmethod
     def gen_shader(vpath, fpath):
 
@@ -14,14 +23,108 @@ class Shader():
         with open(fpath, 'r') as fle:
             f_src = fle.read()
 
-        # pyopengl convient shader program function
-        shader = compileProgram(
+        # use a cached binary of the program if there is one this driver accepts
+        cached = Shader.cacheFile(v_src, f_src)
+        if cached is not None:
+            shader = Shader.load_binary(cached)
+            if shader is not None:
+                return shader
+
+        shader = Shader.link(
             compileShader(v_src, GL_VERTEX_SHADER), # compiles a shader of given source and type
             compileShader(f_src, GL_FRAGMENT_SHADER))
 
+        if cached is not None:
+            Shader.save_binary(shader, cached)
+
         return shader
 
+    # link a program from compiled shaders (the shaders are deleted after), with varyings the
+    # vertex outputs of those names are captured by transform feedback (interleaved in one buffer)
+    @staticmethod
+    def link(*shaders, varyings=None):
+        program = glCreateProgram()
+        for shader in shaders:
+            glAttachShader(program, shader)
+
+        if varyings:
+            names = (ctypes.c_char_p * len(varyings))(*(name.encode() for name in varyings))
+            glTransformFeedbackVaryings(program, len(varyings), ctypes.cast(names, ctypes.POINTER(ctypes.POINTER(GLchar))), GL_INTERLEAVED_ATTRIBS)
+
+        glProgramParameteri(program, GL_PROGRAM_BINARY_RETRIEVABLE_HINT, GL_TRUE)
+        glLinkProgram(program)
+
+        for shader in shaders:
+            glDetachShader(program, shader)
+            glDeleteShader(shader)
+
+        if glGetProgramiv(program, GL_LINK_STATUS) != GL_TRUE:
+            log = glGetProgramInfoLog(program)
+            glDeleteProgram(program)
+            raise RuntimeError(f"shader link failed: {log}")
+
+        return program
+
+    # cache file for these sources on the current driver, None without a cache or program binary support
+    @staticmethod
+    def cacheFile(v_src, f_src):
+        if Shader.cacheDir is None or not glGetIntegerv(GL_NUM_PROGRAM_BINARY_FORMATS):
+            return None
+
+        key = hashlib.sha256()
+        for part in (v_src, f_src, glGetString(GL_VENDOR), glGetString(GL_RENDERER), glGetString(GL_VERSION)):
+            key.update(part if isinstance(part, bytes) else part.encode())
+            key.update(b"\0")
+        return os.path.join(Shader.cacheDir, key.hexdigest() + ".bin")
+
+    # program from a cached binary (format then binary), None if missing or the driver rejects it
+    @staticmethod
+    def load_binary(file):
+        try:
+            with open(file, "rb") as fle:
+                data = fle.read()
+        except OSError:
+            return None
+
+        if len(data) <= 4:
+            return None
+        binaryFormat, = struct.unpack("<I", data[:4])
+
+        # a binary from another driver version is rejected (unknown format or not linked)
+        program = glCreateProgram()
+        try:
+            glProgramBinary(program, binaryFormat, data[4:], len(data) - 4)
+            linked = glGetProgramiv(program, GL_LINK_STATUS) == GL_TRUE
+        except GLError:
+            linked = False
+
+        if not linked:
+            glDeleteProgram(program)
+            return None
+
+        return program
+
+    # write a linked programs binary to the cache (failing to is fine, it just compiles next time)
+    @staticmethod
+    def save_binary(program, file):
+        length = glGetProgramiv(program, GL_PROGRAM_BINARY_LENGTH)
+        if not length:
+            return
+
+        binary = (ctypes.c_ubyte * length)()
+        binaryFormat = GLenum()
+        written = GLsizei()
+        glGetProgramBinary(program, length, written, binaryFormat, binary)
+
+        try:
+            os.makedirs(os.path.dirname(file), exist_ok=True)
+            with open(file + ".tmp", "wb") as fle:
+                fle.write(struct.pack("<I", binaryFormat.value) + bytes(binary)[:written.value])
+            os.replace(file + ".tmp", file)     # never leaves a half written binary
+        except OSError:
+            pass
+
     # delete shader program
     @staticmethod
     def del_shader(program):
-        glDeleteProgram(program)
\ No newline at end of file
+        glDeleteProgram(program)
@@ -1,8 +1,11 @@
 import glm
-import glfw
+from array import array
 import imgui
 from imgui.integrations.glfw import GlfwRenderer
 from components.path import Path
+from components.pathdata import PathData
+from components.pathcache import PathCache
+from components import pathfile
 from OpenGL.GL import glClearColor
 
 # all ui rendering and flags
@@ -30,7 +33,12 @@ class UI():
         # entire ui frame starts
         imgui.new_frame()
 
-        imgui.set_next_window_size(200, 650)
+        # clicking in the scene (not on the ui) picks a point/control of the path
+        io = imgui.get_io()
+        if imgui.is_mouse_clicked(0) and not io.want_capture_mouse and io.mouse_pos[0] >= 220:
+            scene.selected = scene.pick(io.mouse_pos[0] - 220, io.mouse_pos[1])
+
+        imgui.set_next_window_size(200, 780)
         imgui.set_next_window_position(10,10)
 
         # ui style and colour variables 
@@ -67,24 +75,110 @@ class UI():
         # path draw buttons 
 
         if imgui.button("New Random Path"):
-            scene.startTime = glfw.get_time()   # resets draw index by changing start time
-            scene.path.__init__()   # generates a new random path
+            if scene.stream is not None:
+                scene.startTime = scene.clock()   # resets draw index by changing start time
+                scene.stream.regenerate(Path.arcs, Path.arcsegments)    # restart the streaming path
+            else:
+                scene.requestPath(**Path.settings())    # generates a new random path in the background
+
+        # new paths morph from the last one (on the gpu) instead of being traced from the start
+        changed, scene.morph = imgui.checkbox("Morph Paths", scene.morph)
+        if scene.morph:
+            imgui.unindent(-10)
+            changed, scene.morphTime = imgui.slider_float("morph (s)", scene.morphTime, 0.1, 5.0)
+            imgui.indent(-10)
+
+        # path is swapped in (and retraced) once it has been generated
+        if scene.worker.busy():
+            imgui.same_line()
+            imgui.text("generating...")
 
 
         imgui.spacing
         if imgui.button("Retrace Path"):
-            scene.startTime = glfw.get_time()   # retraces the path by resetting the draw time/index
+            scene.startTime = scene.clock()   # retraces the path by resetting the draw time/index
+
+        # back and forward through the paths viewed (cached, so usually swapped in on the next frame)
+        if scene.stream is None:
+            if imgui.button("<"):
+                scene.flipPath(-1)
+            imgui.same_line()
+            if imgui.button(">"):
+                scene.flipPath(1)
+            imgui.same_line()
+            imgui.text(f"{scene.historyIndex + 1}/{len(scene.history)}  seed {scene.path.seed}")
+
+        # keep the seed for new paths (eg. the same path with other settings), or a new one each time
+        changed, fixed = imgui.checkbox("Fixed Seed", Path.nextSeed is not None)
+        if changed:
+            Path.nextSeed = (scene.path.seed or 0) if fixed else None
+        if Path.nextSeed is not None:
+            imgui.unindent(-10)
+            changed, newSeed = imgui.input_int("seed", Path.nextSeed)
+            if changed:
+                Path.nextSeed = max(newSeed, 0)
+            imgui.indent(-10)
+
+        # paths pushed out of the cache are written to disk rather than dropped
+        changed, spill = imgui.checkbox("Spill Cache To Disk", scene.cache.spill is not None)
+        if changed:
+            scene.cache.spill = PathCache.spillDir if spill else None
+
+
+        # save/load the path to a binary path file (loaded by memory mapping it)
+        imgui.spacing()
+        imgui.unindent(-10)
+        changed, scene.pathFile = imgui.input_text("file", scene.pathFile, 256)
+        imgui.indent(-10)
+        if imgui.button("Save Path"):
+            try:
+                pathfile.save(scene.pathFile, scene.path.data())
+                scene.pathFileError = None
+            except OSError as error:    # eg. a directory that can't be written to
+                scene.pathFileError = f"can't save {scene.pathFile}: {error.strerror or error}"
+        imgui.same_line()
+        if imgui.button("Load Path"):
+            try:
+                data = pathfile.load(scene.pathFile)
+                scene.path.upload(data)
+                scene.startTime = scene.clock()
+                scene.pathFileError = None
+            except OSError as error:    # eg. no such file
+                scene.pathFileError = f"can't load {scene.pathFile}: {error.strerror or error}"
+            except ValueError as error:     # not a path file, or cut short
+                scene.pathFileError = str(error)
+        if scene.pathFileError is not None:
+            imgui.text_wrapped(scene.pathFileError)
+
+        # record the path being traced (fixed 50 fps timestep), to a .gif or a directory of png frames
+        imgui.unindent(-10)
+        changed, scene.captureFile = imgui.input_text("rec", scene.captureFile, 256)
+        imgui.indent(-10)
+        if scene.capture is None:
+            if imgui.button("Start Capture"):
+                try:
+                    scene.startCapture(scene.captureFile)
+                    scene.captureError = None
+                except (RuntimeError, OSError) as error:   # eg. a gif without Pillow, or a directory that can't be made
+                    scene.captureError = str(error)
+            if scene.captureError is not None:
+                imgui.text_wrapped(scene.captureError)
+        else:
+            if imgui.button("Stop Capture"):
+                scene.stopCapture()
+            imgui.same_line()
+            imgui.text(f"{scene.capture.frame} frames")
         
 
-        # changes how fast the path is drawn (changes based on num segments and the time mutlipier)
+        # changes how fast the path is drawn (units per second along the path, same speed whatever the segments)
         imgui.spacing
-        imgui.text("Time Multipler")
+        imgui.text("Time Multipler (units/s)")
         imgui.unindent(-10)
-        changed, newMultipler = imgui.slider_int("", value=scene.timeMultipler, # slider for multipler
-            min_value = 1, max_value = 900)
+        changed, newMultipler = imgui.slider_float("", value=scene.timeMultipler, # slider for multipler
+            min_value = 0.1, max_value = 100)
         if changed: # if the value changes , update the time multiplier in the scene
             scene.timeMultipler = newMultipler
-            scene.startTime = glfw.get_time()   # reset the time for the draw index
+            scene.startTime = scene.clock()   # reset the time for the draw index
         imgui.indent(-10)
 
         #----------------------------------------------------------------------------
@@ -107,27 +201,114 @@ class UI():
         imgui.text("Segments (req new path)")
         imgui.unindent(-10)
         changed, newSegments = imgui.slider_int("as", value=Path.arcsegments,
-            min_value = 2, max_value = 300)
+            min_value = 2, max_value = PathData.maxsegments)
         if changed:
             Path.arcsegments = newSegments
         imgui.indent(-10)
 
 
+        # degree of the arcs (2 quadratic, 3 cubic...)
+        imgui.spacing()
+        imgui.text("Degree (req new path)")
+        imgui.unindent(-10)
+        changed, newDegree = imgui.slider_int("d", value=Path.degree,
+            min_value = 2, max_value = Path.maxdegree)
+        if changed:
+            Path.degree = newDegree
+        imgui.indent(-10)
+
+
+        # evaluate the curve on the gpu (segments change live without a new path)
+        imgui.spacing()
+        changed, Path.gpuCurve = imgui.checkbox("GPU Curve (req new path)", Path.gpuCurve)
+
+
+        # int16 curve vertices (half the memory), also used for new collections
+        changed, Path.compact = imgui.checkbox("Compact (req new path)", Path.compact)
+
+        # adaptive segments per arc (segments slider unused), fewer segments on flat arcs
+        changed, Path.adaptive = imgui.checkbox("Adaptive (req new path)", Path.adaptive)
+        if Path.adaptive:
+            imgui.text("Tolerance")
+            imgui.unindent(-10)
+            changed, newTolerance = imgui.slider_float("tol", value=Path.tolerance,
+                min_value = 0.0005, max_value = 0.1, format='%.4f')
+            if changed:
+                Path.tolerance = newTolerance
+            imgui.indent(-10)
+
+
         # reset the path settings to some default 
         imgui.spacing()
         if imgui.button("Reset Path Settings"):
             Path.arcsegments = 80
             Path.arcs = 8
+            Path.degree = 2
+            Path.gpuCurve = False
+            Path.adaptive = False
+            Path.tolerance = 0.005
+            Path.compact = False
+            Path.nextSeed = None
 
 
         # disables/enables showing path extras
         imgui.spacing()
+        changed, scene.cull = imgui.checkbox("Cull Arcs", scene.cull)   # only draw arcs in view
+        changed, scene.lod = imgui.checkbox("Level Of Detail", scene.lod)  # far arcs with fewer segments
+        if scene.lod:
+            changed, scene.lodPixels = imgui.slider_float("LOD tolerance (px)", scene.lodPixels, 0.1, 4.0)
+        if scene.selected is not None:
+            imgui.text(f"selected {scene.selected[0]} {scene.selected[1]}")
+
         changed, scene.showControls = imgui.checkbox("Show Controls", scene.showControls)
 
         changed, scene.showPoints = imgui.checkbox("Show Points", scene.showPoints)
 
         changed, scene.showSegments = imgui.checkbox("Show Segments", scene.showSegments)
 
+        changed, scene.grow = imgui.checkbox("Keep Growing", scene.grow)  # adds arcs to the end of the path
+
+        changed, scene.idle = imgui.checkbox("Idle When Still", scene.idle)  # only redraw when something changes
+
+        # endless path keeping the newest (arcs) arcs on screen
+        changed, streaming = imgui.checkbox("Streaming Path", scene.stream is not None)
+        if changed:
+            if streaming:
+                from components.ringpath import RingPath
+                scene.stream = RingPath(Path.arcs, Path.arcsegments)
+            else:
+                scene.stream.release()
+                scene.stream = None
+            scene.startTime = scene.clock()
+
+        # arcs sent by another process (eg. python rand-bezier.py feed) added to the end of the path
+        changed, listening = imgui.checkbox("Live Feed", scene.feed is not None)
+        if changed:
+            from components import feed
+            try:
+                scene.listenFeed(feed.ADDRESS if listening else None)
+                scene.feedError = None
+            except OSError as error:    # eg. the address in use by another listener
+                scene.feedError = f"can't listen on {feed.ADDRESS}: {error.strerror or error}"
+        if scene.feed is not None:
+            imgui.text(f"{scene.feed.received} arcs received" + (f", {scene.feed.dropped} dropped" if scene.feed.dropped else ""))
+        elif scene.feedError is not None:
+            imgui.text_wrapped(scene.feedError)
+
+        # many more random paths (current arcs/segments) drawn at once
+        imgui.unindent(-10)
+        changed, scene.collectionSize = imgui.slider_int("paths", value=scene.collectionSize,
+            min_value = 1, max_value = 5000)
+        imgui.indent(-10)
+        # (generated off the gl thread, filling in over a few frames, capped at PathCollection.maxVertices)
+        if imgui.button("New Collection"):
+            scene.newCollection(scene.collectionSize)
+        if scene.collection is not None:
+            imgui.same_line()
+            if imgui.button("Clear"):
+                scene.clearCollection()
+            imgui.text(f"{len(scene.collection)}/{scene.collectionCount} paths  seed {scene.collectionSeed}")
+
 
         #----------------------------------------------------------------------------
 
@@ -209,6 +390,39 @@ class UI():
         imgui.indent(-10)
 
 
+        #----------------------------------------------------------------------------
+
+        # profiling section (frame times of the last few hundred frames)
+
+        imgui.spacing()
+        imgui.spacing()
+        imgui.separator()
+        expanded, visible = imgui.collapsing_header("Profiling")
+        if expanded:
+            profiler = scene.profiler
+
+            # rolling frame time graph
+            frames = array("f", profiler.values("frame"))
+            p50, p95, p99 = profiler.percentiles("frame")
+            imgui.plot_lines("##frames", frames, scale_min=0, graph_size=(180, 50),
+                overlay_text=f"{p50:.2f} ms")
+            imgui.text(f"p95 {p95:.2f}  p99 {p99:.2f} ms")
+
+            # median time of each stage (cpu and gpu), and counts (eg. vertices drawn)
+            for key in profiler.keys():
+                if key in profiler.counts:
+                    imgui.text(f"{key:10s} {profiler.percentiles(key)[0]:6.0f}")
+                elif key != "frame":
+                    imgui.text(f"{key:10s} {profiler.percentiles(key)[0]:6.3f} ms")
+
+            # write recorded frames to a file
+            imgui.unindent(-10)
+            changed, scene.profileFile = imgui.input_text("out", scene.profileFile, 256)
+            imgui.indent(-10)
+            if imgui.button("Export Timings"):
+                profiler.export(scene.profileFile)
+
+
         #----------------------------------------------------------------------------
         
         # pop styles and colours after ui 
@@ -0,0 +1,161 @@
+import threading
+import numpy
+
+from components import bezier
+from components.pathdata import PathData
+
+# generates new random paths on a background thread so the window keeps drawing
+# only the newest request matters, requests made while busy replace any waiting one
+# and a result that has been superseded is thrown away (no queue of stale paths)
+# with a PathCache recently made paths are taken from it rather than generated again
+class PathWorker():
+
+    def __init__(self, cache=None):
+        self.cache = cache
+        self.cond = threading.Condition()
+        self.pending = None     # settings of the newest request not started yet
+        self.ready = None       # newest finished path data, waiting to be uploaded
+        self.working = False
+        self.notify = None      # called (on the worker thread) when a path is ready
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+
+    # ask for a new path (PathData.generate keyword arguments), replaces any request that hasn't started
+    # morph is the (curve, lengths) of the path shown to morph from, matched to the new curve here
+    def request(self, morph=None, **settings):
+        with self.cond:
+            self.pending = (settings, morph)
+            self.ready = None   # an older finished path is no longer wanted
+            self.cond.notify()
+
+
+    # true until the newest requested path is ready
+    def busy(self):
+        with self.cond:
+            return self.working or self.pending is not None
+
+
+    # true if a finished path is waiting to be taken
+    def finished(self):
+        with self.cond:
+            return self.ready is not None
+
+
+    # finished path data (for Path.upload on the gl thread) and the positions to morph from (see
+    # morphFrom, None without), (None, None) if nothing new
+    def take(self):
+        with self.cond:
+            ready, self.ready = self.ready, None
+        return ready if ready is not None else (None, None)
+
+
+    # the old curve position of each new curve vertex, vertex for vertex when the counts match, otherwise
+    # (other arcs or segments) the old curve resampled at the same fraction of its length as each new vertex
+    @staticmethod
+    def morphFrom(data, curve, lengths):
+        if data.gpu or not len(curve):
+            return None
+        if len(curve) == len(data.curve):
+            return curve
+        new = data.lengths
+        return bezier.resample(curve, lengths, new / max(new[-1], 1e-9) * lengths[-1])
+
+
+    # worker thread loop
+    def run(self):
+        while True:
+            with self.cond:
+                while self.pending is None:
+                    self.cond.wait()
+                (settings, morph), self.pending = self.pending, None
+                self.working = True
+
+            data = self.cache.generate(**settings) if self.cache is not None else PathData.generate(**settings)
+            source = PathWorker.morphFrom(data, *morph) if morph is not None else None
+
+            with self.cond:
+                self.working = False
+                if self.pending is None:    # keep only if nothing newer was asked for meanwhile
+                    self.ready = (data, source)
+                    if self.notify is not None:
+                        self.notify()
+
+
+# generates a collection of random paths on a background thread a chunk of paths at a time (batch.generateChunk,
+# packed there for a compact collection), the gl thread adds the finished chunks each frame (take) so the
+# window keeps drawing while a big collection fills in, at most a couple of chunks wait to be taken (memory
+# stays bounded however big the collection), a new request drops what's left of the last one
+class CollectionWorker():
+
+    chunkVertices = 2000000     # curve vertices generated at a time
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.tasks = []         # chunks of the newest request not started yet
+        self.quant = None       # quant of the newest requests collection (None for floats)
+        self.ready = []         # finished chunks (points, controls, curve), waiting to be added
+        self.generation = 0     # bumped by every request, chunks of older ones are thrown away
+        self.working = False
+        self.notify = None      # called (on the worker thread) when a chunk is ready
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+
+    # generate count paths from seed (each chunk has its own seed spawned from it, like batch.generate,
+    # so the paths only depend on the seed and settings), replaces any request still going
+    def request(self, count, arcs, segments, seed, degree=2, quant=None):
+        perchunk = max(1, CollectionWorker.chunkVertices // (arcs * segments))
+        sizes = [min(perchunk, count - start) for start in range(0, count, perchunk)]
+        seeds = numpy.random.SeedSequence(seed).spawn(len(sizes))
+        with self.cond:
+            self.generation += 1
+            self.tasks = [(size, arcs, segments, s, degree) for size, s in zip(sizes, seeds)]
+            self.quant = quant
+            self.ready = []
+            self.cond.notify()
+
+
+    # drop what's left of the request
+    def cancel(self):
+        with self.cond:
+            self.generation += 1
+            self.tasks = []
+            self.ready = []
+            self.cond.notify()
+
+
+    # true until every chunk of the request has been taken
+    def busy(self):
+        with self.cond:
+            return self.working or bool(self.tasks) or bool(self.ready)
+
+
+    # finished chunks (for PathCollection.addBatch on the gl thread), [] if nothing new
+    def take(self):
+        with self.cond:
+            ready, self.ready = self.ready, []
+            self.cond.notify()      # room for more
+        return ready
+
+
+    # worker thread loop
+    def run(self):
+        from components import batch    # multiprocessing (batch.generate) only imported with a collection
+        while True:
+            with self.cond:
+                while not self.tasks or len(self.ready) >= 2:
+                    self.cond.wait()
+                task, quant, generation = self.tasks.pop(0), self.quant, self.generation
+                self.working = True
+
+            chunk = batch.generateChunk(task, quant)
+
+            with self.cond:
+                self.working = False
+                if generation == self.generation:
+                    self.ready.append(chunk)
+                    if self.notify is not None:
+                        self.notify()
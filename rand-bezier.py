@@ -1,208 +1,85 @@
-import glfw
-import glm
-from math import floor
-from OpenGL.GL import *
-
-from components.shader import Shader
-from components.ui import UI
-from components.axis import Axis
-from components.path import Path
-
-
-PATH_VERTEX = "shaders/path_vert.glsl"
-PATH_FRAGMENT = "shaders/path_frag.glsl"
-AXIS_VERTEX = "shaders/axis_vert.glsl"
-AXIS_FRAGMENT = "shaders/axis_frag.glsl"
-
-
-class Scene():
-    WIDTH = 1000
-    HEIGHT = 800
-
-    def __init__(self):
-
-        # init window and context
-        glfw.init()
-        glfw.window_hint(glfw.CONTEXT_VERSION_MAJOR, 3)
-        glfw.window_hint(glfw.CONTEXT_VERSION_MINOR, 3)
-        glfw.window_hint(glfw.OPENGL_PROFILE, glfw.OPENGL_CORE_PROFILE)
-
-        # glfw window
-        self.window = glfw.create_window(Scene.WIDTH, Scene.HEIGHT, "random-bezier", None, None)
-
-        glfw.set_window_attrib(self.window, glfw.RESIZABLE, False)
-        glfw.set_window_pos(self.window, 200, 100)
-        glfw.make_context_current(self.window)
-        glfw.swap_interval(0)   # vsync enabled/disabled
-
-        # setup shader programs
-        self.path_shader = Shader.gen_shader(PATH_VERTEX, PATH_FRAGMENT)
-        self.axis_shader = Shader.gen_shader(AXIS_VERTEX, AXIS_FRAGMENT)
-
-        self.clear_colour = (0.160, 0.294, 0.305)   # back colour
-
-        # gl configure
-        glClearColor(*self.clear_colour, 1.0)
-        glViewport(220, 0, Scene.WIDTH - 220, Scene.HEIGHT) 
-        glEnable(GL_DEPTH_TEST)
-        glEnable(GL_BLEND)
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-
-        # imgui UI object
-        self.ui = UI(window=self.window)
-
-        # store reference to shader uniforms
-        self.col_uni = glGetUniformLocation(self.path_shader, "ucol")   # paths shader uniforms
-        self.view_uni = glGetUniformLocation(self.path_shader, "view")
-        self.proj_uni = glGetUniformLocation(self.path_shader, "proj")
-
-        self.view_uni_axis = glGetUniformLocation(self.axis_shader, "view") # axis shader uniforms 
-        self.proj_uni_axis = glGetUniformLocation(self.axis_shader, "proj")
-
-        # default camera transform
-        self.positionCamera = glm.vec3(0.0, -0.6, -6)   # move camera back origin
-        self.rotationCamera = glm.vec3(25, -45, 0.0)
-        self.scaleCamera = 0.92
-
-        # create and set perspective matrix in both shader programs as uniforms (only set once)
-        proj = glm.perspective(90, 1, 0.1, 200)
-        glUseProgram(self.axis_shader)
-        glUniformMatrix4fv(self.proj_uni_axis, 1, GL_FALSE, glm.value_ptr(proj))
-        glUseProgram(self.path_shader)
-        glUniformMatrix4fv(self.proj_uni, 1, GL_FALSE, glm.value_ptr(proj))
-
-        # axis ( x y z lines )
-        self.axis = Axis()
-
-        # path is the programs entire curve (data/buffer/vao/settings)
-        self.path = Path()
-
-        # draw index of the curve (used to draw the path out over time)
-        self.pathIndex = 0
-
-        # some path/camera settings
-        self.turn = True
-        self.pathTime = 0
-        self.startTime = 0
-        self.timeMultipler = 50
-        self.showControls = True
-        self.showPoints = True
-        self.showSegments = False
-        self.showAxis = True
-
-
-        self.run()
-
-    def run(self):
-  
-        self.startTime = glfw.get_time()
-        
-        while not glfw.window_should_close(self.window):
-            
-            glfw.poll_events()
-            glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-            
-            # render(and updates) enitre scene
-            self.render()
-
-            # render ui
-            self.ui.render(scene=self)
-
-            glfw.swap_buffers(self.window)
-
-
-        # terminate after loop
-        self.end()
-
-    
-    # main scene render/update
-    def render(self):
- 
-        # calc how much of path to draw based on time elapsed
-        self.pathTime = glfw.get_time() - self.startTime
-        self.pathIndex = min(floor(self.pathTime * self.timeMultipler), len(self.path.curve)//3)
-
-        # small camera rotate  
-        if self.turn: 
-            self.rotationCamera[1] += 0.006     # amount of turn
-        
-        # calc view matrix (from cameras transform)
-        view = glm.mat4(1.0)
-        view = glm.translate(view, self.positionCamera)
-        view = glm.rotate(view, glm.radians(self.rotationCamera[0]), glm.vec3(1.0, 0.0, 0.0))
-        view = glm.rotate(view, glm.radians(self.rotationCamera[1]), glm.vec3(0.0, 1.0, 0.0))
-        view = glm.rotate(view, glm.radians(self.rotationCamera[2]), glm.vec3(0.0, 0.0, 1.0))
-        view = glm.scale(view, glm.vec3(self.scaleCamera))
-
-        
-        # use axis shader       
-        glUseProgram(self.axis_shader)
-
-        # sets the view matrix uniform in the axis shader (doesnt need model matrix, as axis is constant transform)
-        glUniformMatrix4fv(self.view_uni_axis, 1, GL_FALSE, glm.value_ptr(view))
-
-
-        # axis draw
-        glLineWidth(1)
-        if self.showAxis:
-            glBindVertexArray(self.axis.vao)
-            glDrawArrays(GL_LINES, 0, self.axis.ngrid)
-
-
-        # use path shader
-        glUseProgram(self.path_shader)
-
-
-        # set the view uniform (previously calcualted) now in the path shader
-        glUniformMatrix4fv(self.view_uni, 1, GL_FALSE, glm.value_ptr(view))
-
-        # set the paths colour uniform in shader
-        colour = glm.vec4(1.0, 1.0, 1.0, 0.9)
-        glUniform4fv(self.col_uni, 1, glm.value_ptr(colour))
-        
-        # bind the path vao and draw the path (curve itself - made of arcs each with segments )
-        glBindVertexArray(self.path.pathvao)
-        glDrawArrays(GL_LINE_STRIP, 0, self.pathIndex)
-
-        # draw each segment of each arc of the curve (every point of the curve)
-        if self.showSegments:
-            # use slightly different colour for segments of curve
-            colour = glm.vec4(0.8, 0.8, 0.8, 0.7)
-            glUniform4fv(self.col_uni, 1, glm.value_ptr(colour))
-            glPointSize(1)
-            glDrawArrays(GL_POINTS, 0, len(self.path.curve)//3)
-        
-
-        # draw the points of curve (start and end points of each arc)
-        if self.showPoints:
-            colour = glm.vec4(1.0, 1.0, 1.0, 0.8)
-            glUniform4fv(self.col_uni, 1, glm.value_ptr(colour))
-            glPointSize(4)
-            glBindVertexArray(self.path.pointsvao)
-            glDrawArrays(GL_POINTS, 0, len(self.path.points) // 3)
- 
-
-        # draws the controls of the bezier arcs (one control point for every two arc endpoints)
-        if self.showControls:
-            colour = glm.vec4(1.0, 0.5, 0.2, 1.0)
-            glUniform4fv(self.col_uni, 1, glm.value_ptr(colour))
-            glPointSize(3)
-            glBindVertexArray(self.path.controlsvao)
-            glDrawArrays(GL_POINTS, 0, len(self.path.controls) // 3)
-
-
-
-    # delete buffer/array/shaders and terminte ui/window
-    def end(self):
-        del self.path
-        self.ui.renderer.shutdown()
-        del self.axis
-        Shader.del_shader(self.path_shader)
-        Shader.del_shader(self.axis_shader)
-        glfw.destroy_window(self.window)
-        glfw.terminate()
-
+import argparse
+import os
 
+# most the path shader evaluates and the feed carries (Path.maxdegree, feed.MAXDEGREE), not imported
+# from them here as that would bring in gl/numpy before the command needs them
+MAXDEGREE = 8
+DEGREES = range(2, MAXDEGREE + 1)
 
 if __name__ == "__main__":
-    scene = Scene()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="random bezier curves (opens the editor window without a command)")
+    commands = parser.add_subparsers(dest="command")
+
+    # headless bulk generation of random paths
+    generate = commands.add_parser("generate", help="generate many random paths to .npz/.npy files (no window)")
+    generate.add_argument("--count", type=int, default=1000, help="number of paths")
+    generate.add_argument("--arcs", type=int, default=8, help="arcs per path")
+    generate.add_argument("--segments", type=int, default=80, help="segments per arc")
+    generate.add_argument("--degree", type=int, choices=DEGREES, default=2, metavar=f"2-{MAXDEGREE}", help="degree of the arcs (2 quadratic, 3 cubic...)")
+    generate.add_argument("--seed", type=int, default=0, help="random seed (same seed and chunk give the same paths)")
+    generate.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    generate.add_argument("--chunk", type=int, default=1000, help="paths per chunk (written as they finish)")
+    generate.add_argument("--format", choices=("npz", "npy"), default="npz",
+                          help="npz: one file per chunk, npy: single points/controls/curve arrays")
+    generate.add_argument("--out", default="paths", help="output directory")
+
+    # headless recording of a traced path (fixed timestep, as fast as it renders)
+    capture = commands.add_parser("capture", help="record a path being traced to a .gif or png frames (no window)")
+    capture.add_argument("--arcs", type=int, default=8, help="arcs in the path")
+    capture.add_argument("--segments", type=int, default=80, help="segments per arc")
+    capture.add_argument("--seed", type=int, default=0, help="random seed of the path")
+    capture.add_argument("--fps", type=int, default=50, help="frames per second of simulated time")
+    capture.add_argument("--frames", type=int, help="frames to record (default until the path is traced)")
+    capture.add_argument("--out", default="frames", help="directory for png frames or .gif file (needs Pillow)")
+
+    # stand-in producer for the editors live feed, sends a random walk of waypoints as arcs
+    feed = commands.add_parser("feed", help="send arcs to an editor listening for a live feed")
+    feed.add_argument("--address", help="unix socket path or host:port (default the editors)")
+    feed.add_argument("--arcs", type=int, default=1000, help="arcs to send")
+    feed.add_argument("--batch", type=int, default=4, help="arcs per frame")
+    feed.add_argument("--rate", type=float, default=20, help="arcs per second (0 as fast as possible)")
+    feed.add_argument("--degree", type=int, choices=DEGREES, default=2, metavar=f"2-{MAXDEGREE}", help="degree of the arcs (the paths degree)")
+    feed.add_argument("--seed", type=int, help="random seed of the walk")
+
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        from components import batch    # numpy/multiprocessing only imported for the command that needs them
+        rate = batch.generate(args.count, args.arcs, args.segments, args.seed, args.workers,
+                              args.out, chunk=args.chunk, fmt=args.format, degree=args.degree)
+        print(f"{args.count} paths ({args.arcs} arcs x {args.segments} segments) to {args.out}/   {rate:.0f} paths/s")
+    elif args.command == "feed":
+        import asyncio
+        from components import feed     # no gl needed to send arcs
+        address = args.address or feed.ADDRESS
+        try:
+            sent, seconds = asyncio.run(feed.produce(address, args.arcs, args.batch, args.rate or None,
+                                                     args.degree, args.seed))
+            print(f"{sent} arcs to {address}   {sent / seconds:.0f} arcs/s")
+        except (OSError, ConnectionError) as error:
+            print(f"feed {address} closed or not listening ({error})")
+    elif args.command == "capture":
+        import math
+        import time
+        import components.offscreen     # headless gl, before anything imports OpenGL
+        from components.scene import Scene
+        from components.path import Path
+
+        Path.arcs, Path.arcsegments, Path.nextSeed = args.arcs, args.segments, args.seed
+        scene = Scene(offscreen=True)
+
+        frames = args.frames or math.ceil(scene.path.length() / scene.timeMultipler * args.fps) + 1
+        start = time.perf_counter()
+        try:
+            scene.startCapture(args.out, args.fps)
+        except (RuntimeError, OSError) as error:    # eg. a gif without Pillow
+            scene.end()
+            parser.exit(1, f"capture: {error}\n")
+        for frame in range(frames):
+            scene.frame()
+        written = scene.stopCapture()
+        print(f"{written} frames to {args.out}   {written / (time.perf_counter() - start):.0f} frames/s")
+        scene.end()
+    else:
+        from components.scene import Scene  # window/gl only needed for the editor
+        scene = Scene()
@@ -3,12 +3,68 @@
 // path vertex attribute position
 layout (location=0) in vec3 apos;
 
+// morphing from the last path, its position for this vertex and how much of it is left (0 not morphing)
+layout (location=1) in vec3 afrom;
+uniform float morph;
+
+// compact (int16) positions are scaled back into the paths box (scale 1 and offset 0 for floats)
+uniform vec3 quantscale;
+uniform vec3 quantoffset;
+
 // paths transform matrices
 uniform mat4 model;
 uniform mat4 view;
 uniform mat4 proj;
 
+// gpu curve, each vertex evaluated from the arc endpoints and controls
+uniform bool gpucurve;
+uniform int arcsegments;
+uniform int degree;             // degree - 1 controls per arc (up to MAXDEGREE, Path.maxdegree)
+uniform samplerBuffer points;   // endpoints (floats x y z)
+uniform samplerBuffer controls; // controls (floats x y z)
+
+#define MAXDEGREE 8
+
+// partly traced segment at the end of the path, a line between two points
+uniform bool tipline;
+uniform vec3 tip[2];
+
+vec3 fetch(samplerBuffer buf, int i)
+{
+    return vec3(texelFetch(buf, i*3).r, texelFetch(buf, i*3 + 1).r, texelFetch(buf, i*3 + 2).r);
+}
+
 void main()
 {
-    gl_Position = proj * view * vec4(apos.x, apos.y, apos.z, 1.0);
-}
\ No newline at end of file
+    vec3 pos = apos * quantscale + quantoffset;
+
+    if (tipline)
+    {
+        pos = tip[gl_VertexID];
+    }
+    else if (gpucurve)
+    {
+        // which arc and how far along it this vertex is (same t as Path.calcNew)
+        int arc = gl_VertexID / arcsegments;
+        float t = float(gl_VertexID % arcsegments) / float(arcsegments - 1);
+
+        // start, controls and end of the arc
+        vec3 p[MAXDEGREE + 1];
+        p[0] = fetch(points, arc);
+        for (int k = 1; k < degree; k++)
+            p[k] = fetch(controls, arc * (degree - 1) + k - 1);
+        p[degree] = fetch(points, arc + 1);
+
+        // de casteljau, each round mixes neighbouring points until one is left
+        for (int r = degree; r > 0; r--)
+            for (int k = 0; k < r; k++)
+                p[k] = mix(p[k], p[k + 1], t);
+        pos = p[0];
+    }
+    else if (morph > 0.0)
+    {
+        pos = mix(pos, afrom, morph);
+    }
+
+    gl_Position = proj * view * vec4(pos.x, pos.y, pos.z, 1.0);
+}